@@ -1,7 +1,8 @@
 import uuid
+from datetime import datetime
 from typing import List, Optional
 
-from sqlalchemy import ForeignKey, String, Text
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from core.db.mixins import CreatedAtMixin, UUIDIdIndexMixin
@@ -14,8 +15,9 @@ class Article(Base, UUIDIdIndexMixin, CreatedAtMixin):
     url: Mapped[str] = mapped_column(String(1024), unique=True, nullable=False)
     content: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     parent_id: Mapped[Optional[uuid.UUID]] = mapped_column(
-        ForeignKey("articles.id"), nullable=True
+        ForeignKey("articles.id"), nullable=True, index=True
     )
+    fetched_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
     # Relationships
     parent = relationship(
@@ -32,6 +34,39 @@ class ArticleSummary(Base, UUIDIdIndexMixin, CreatedAtMixin):
         ForeignKey("articles.id"), unique=True, nullable=False
     )
     summary: Mapped[str] = mapped_column(Text, nullable=False)
+    # Время последней перезаписи summary; created_at - время первого сохранения
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
 
     # Relationships
     article = relationship("Article", back_populates="summary")
+
+
+class ArticleLink(Base):
+    """
+    Ссылка со статьи source на статью по URL ``target_url``.
+    ``target_id`` заполняется, когда статья target сохранена (в том числе позже source)
+    """
+
+    source_id: Mapped[uuid.UUID] = mapped_column(ForeignKey("articles.id"), primary_key=True)
+    target_url: Mapped[str] = mapped_column(String(1024), primary_key=True)
+    target_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("articles.id"), nullable=True, index=True
+    )
+    # Порядковый номер ссылки на странице source
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    __table_args__ = (
+        # Ссылки на ещё не сохранённые статьи ищутся по URL при их сохранении
+        Index("ix_article_links_unresolved", "target_url", postgresql_where=text("target_id IS NULL")),
+    )
+
+
+class ArticleAlias(Base, UUIDIdIndexMixin, CreatedAtMixin):
+    """ Другой URL той же статьи: перенаправление или альтернативное название """
+
+    __tablename__ = "article_aliases"
+
+    url: Mapped[str] = mapped_column(String(1024), unique=True, nullable=False)
+    article_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey("articles.id"), nullable=False, index=True
+    )
@@ -1,10 +1,399 @@
-from articles.models import Article, ArticleSummary
+import uuid
+from datetime import datetime, timedelta
+from typing import AsyncIterable, Dict, Iterable, List, Optional, Sequence, Union
+
+from sqlalchemy import ColumnElement, Result, Row, delete, func, literal, select, text, union_all
+
+from articles.models import Article, ArticleAlias, ArticleLink, ArticleSummary
 from core.utils.repository import SQLAlchemyRepository
+from parsers.urls import canonicalize_url
+
+
+ARTICLE_STAGING_COLUMNS = {
+    "url": "text",
+    "title": "text",
+    "content": "text",
+    "fetched_at": "timestamp",
+    "parent_url": "text",
+}
+
+# Последняя загрузка каждого URL переносится в articles, затем проставляются
+# ссылки на родителей, которые могут находиться в той же пачке. Как и в
+# add_or_refresh_many, родитель проставляется только вставленным статьям
+# (xmax = 0 у вставленной, а не обновлённой строки): уже сохранённые статьи,
+# в том числе корни других деревьев, не переподвешиваются
+ARTICLE_MERGE_STATEMENTS = (
+    "ALTER TABLE articles_staging ADD COLUMN inserted boolean NOT NULL DEFAULT false",
+    """
+    WITH merged AS (
+        INSERT INTO articles (id, url, title, content, fetched_at, created_at)
+        SELECT DISTINCT ON (url)
+            gen_random_uuid(), url, title, content, fetched_at, now() at time zone 'utc'
+        FROM articles_staging
+        ORDER BY url, fetched_at DESC
+        ON CONFLICT (url) DO UPDATE SET
+            title = excluded.title,
+            content = excluded.content,
+            fetched_at = excluded.fetched_at
+        WHERE articles.fetched_at < excluded.fetched_at
+        RETURNING url, xmax = 0 AS inserted
+    )
+    UPDATE articles_staging AS staging
+    SET inserted = true
+    FROM merged
+    WHERE merged.inserted AND staging.url = merged.url
+    """,
+    """
+    UPDATE articles AS child
+    SET parent_id = parent.id
+    FROM articles_staging AS staging
+    JOIN articles AS parent ON parent.url = staging.parent_url
+    WHERE staging.inserted
+      AND child.url = staging.url
+      AND child.parent_id IS NULL
+      AND child.id <> parent.id
+    """,
+    """
+    SELECT articles.url, articles.id
+    FROM articles
+    JOIN (SELECT DISTINCT url FROM articles_staging) AS staging ON staging.url = articles.url
+    """,
+)
+
+# Связи пишутся только на уже сохранённые статьи: URL ссылок сопоставляются с articles
+ARTICLE_LINKS_INSERT = text(
+    """
+    INSERT INTO article_links (source_id, target_url, target_id, position)
+    SELECT edges.source_id, edges.url, COALESCE(articles.id, aliases.article_id), edges.position
+    FROM unnest(
+        CAST(:source_ids AS uuid[]), CAST(:urls AS text[]), CAST(:positions AS integer[])
+    ) AS edges(source_id, url, position)
+    LEFT JOIN articles ON articles.url = edges.url
+    LEFT JOIN article_aliases AS aliases ON aliases.url = edges.url
+    WHERE COALESCE(articles.id, aliases.article_id) IS DISTINCT FROM edges.source_id
+    ON CONFLICT (source_id, target_url) DO NOTHING
+    """
+)
+
+# Ссылки, сохранённые раньше статей, на которые они ведут
+ARTICLE_LINKS_RESOLVE = text(
+    """
+    UPDATE article_links
+    SET target_id = articles.id
+    FROM articles
+    WHERE article_links.target_id IS NULL
+        AND article_links.target_url = articles.url
+        AND articles.id = ANY(CAST(:article_ids AS uuid[]))
+        AND article_links.source_id <> articles.id
+    """
+)
+
+ARTICLE_LINKS_RESOLVE_ALIASES = text(
+    """
+    UPDATE article_links
+    SET target_id = aliases.article_id
+    FROM article_aliases AS aliases
+    WHERE article_links.target_id IS NULL
+        AND article_links.target_url = aliases.url
+        AND aliases.url = ANY(CAST(:urls AS text[]))
+        AND article_links.source_id <> aliases.article_id
+    """
+)
+
+ARTICLE_ALIASES_UPSERT = text(
+    """
+    INSERT INTO article_aliases (id, url, article_id, created_at)
+    SELECT gen_random_uuid(), aliases.url, articles.id, now() at time zone 'utc'
+    FROM unnest(CAST(:urls AS text[]), CAST(:canonical_urls AS text[])) AS aliases(url, canonical_url)
+    JOIN articles ON articles.url = aliases.canonical_url
+    ON CONFLICT (url) DO UPDATE SET article_id = excluded.article_id
+    """
+)
+
+
+def _article_id_by_url(url: str) -> ColumnElement:
+    """ Id статьи по каноническому URL или по её псевдониму """
+    url = canonicalize_url(url)
+    # Два скалярных подзапроса вместо OR: каждый идёт по своему уникальному индексу
+    return func.coalesce(
+        select(Article.id).where(Article.url == url).scalar_subquery(),
+        select(ArticleAlias.article_id).where(ArticleAlias.url == url).scalar_subquery(),
+    )
 
 
 class ArticleRepository(SQLAlchemyRepository):
     model = Article
 
+    async def add_or_refresh_many(self, data: List[dict]) -> Dict[str, uuid.UUID]:
+        """
+        Сохраняет уровень дерева статей одним запросом и возвращает ``url -> id``.
+
+        Статьи, загруженные раньше, получают новое содержимое;
+        ``parent_id`` существующих статей не меняется. Ссылки сохраняет ``replace_links``.
+        """
+        return await self.add_or_get_many(
+            data,
+            conflict_cols=["url"],
+            update_cols=["title", "content", "fetched_at"],
+            update_where=lambda excluded: Article.fetched_at < excluded.fetched_at,
+        )
+
+    async def bulk_load(
+        self, records: Union[Iterable[dict], AsyncIterable[dict]]
+    ) -> Dict[str, uuid.UUID]:
+        """
+        Загружает статьи через COPY и возвращает ``url -> id``.
+
+        Записи содержат ``url``, ``title``, ``content``, ``links``, ``fetched_at``
+        и ``parent_url``; ``parent_id`` проставляется по ``parent_url`` только
+        новым статьям, как и в ``add_or_refresh_many``. Ссылки записей, где они
+        есть, сохраняются в ``article_links``. Подходит для больших обходов и
+        импорта, для небольших деревьев быстрее ``add_or_refresh_many``.
+        """
+        links: Dict[str, List[str]] = {}
+        result = await self.copy_merge(
+            _article_copy_records(records, links),
+            staging_columns=ARTICLE_STAGING_COLUMNS,
+            merge_statements=ARTICLE_MERGE_STATEMENTS,
+            staging_table="articles_staging",
+        )
+        ids = {row.url: row.id for row in result}
+        await self.replace_links({ids[url]: url_links for url, url_links in links.items()})
+        return ids
+
+    async def get_by_url(self, url: str) -> Optional[Article]:
+        """ Статья по URL с учётом канонической формы и псевдонимов """
+        result: Result = await self.session.execute(
+            select(Article).where(Article.id == _article_id_by_url(url))
+        )
+        return result.scalar_one_or_none()
+
+    async def get_fresh_by_urls(self, urls: Sequence[str], max_age: timedelta) -> Dict[str, Article]:
+        """
+        Возвращает статьи, загруженные не раньше ``max_age`` назад,
+        по запрошенному URL; URL может быть и псевдонимом статьи
+        """
+        if not urls:
+            return {}
+        requested = union_all(
+            select(Article.id.label("article_id"), Article.url.label("url")).where(Article.url.in_(urls)),
+            select(ArticleAlias.article_id, ArticleAlias.url).where(ArticleAlias.url.in_(urls)),
+        ).subquery()
+        stmt = (
+            select(requested.c.url, Article)
+            .join(Article, Article.id == requested.c.article_id)
+            .where(Article.fetched_at >= datetime.utcnow() - max_age)
+        )
+        result: Result = await self.session.execute(stmt)
+        return {url: article for url, article in result.all()}
+
+    async def get_links(self, article_ids: Sequence[uuid.UUID]) -> Dict[uuid.UUID, List[str]]:
+        """ Исходящие ссылки статей в порядке на странице; статей без ссылок в результате нет """
+        if not article_ids:
+            return {}
+        stmt = (
+            select(ArticleLink.source_id, ArticleLink.target_url)
+            .where(ArticleLink.source_id.in_(article_ids))
+            .order_by(ArticleLink.source_id, ArticleLink.position)
+        )
+        result: Result = await self.session.execute(stmt)
+        links: Dict[uuid.UUID, List[str]] = {}
+        for source_id, target_url in result.all():
+            links.setdefault(source_id, []).append(target_url)
+        return links
+
+    async def list_ids_without_summary(self, limit: int) -> List[uuid.UUID]:
+        """ Дочерние статьи без summary, сначала самые новые """
+        stmt = (
+            select(Article.id)
+            .outerjoin(ArticleSummary, ArticleSummary.article_id == Article.id)
+            .where(Article.parent_id.is_not(None), ArticleSummary.id.is_(None))
+            .order_by(Article.created_at.desc())
+            .limit(limit)
+        )
+        result: Result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+
+    async def get_with_summary(self, url: str) -> Optional[Row]:
+        """
+        Статья и её summary одним запросом. Возвращает ``None``, если статьи нет;
+        поля summary равны ``None``, если у статьи нет summary
+        """
+        stmt = (
+            select(
+                Article.id.label("article_id"),
+                Article.title,
+                Article.url,
+                ArticleSummary.summary,
+                ArticleSummary.created_at,
+            )
+            .outerjoin(ArticleSummary, ArticleSummary.article_id == Article.id)
+            .where(Article.id == _article_id_by_url(url))
+        )
+        result: Result = await self.session.execute(stmt)
+        return result.one_or_none()
+
+    async def get_subtree(self, url: str, depth: int, include_content: bool = True) -> List[Row]:
+        """
+        Поддерево статьи до ``depth`` уровней одним рекурсивным запросом.
+        Строки упорядочены по уровню, у исходной статьи уровень 1
+        """
+        tree = (
+            select(Article.id, literal(1).label("depth"))
+            .where(Article.id == _article_id_by_url(url))
+            .cte("tree", recursive=True)
+        )
+        tree = tree.union_all(
+            select(Article.id, tree.c.depth + 1)
+            .join(tree, Article.parent_id == tree.c.id)
+            .where(tree.c.depth < depth)
+        )
+
+        columns = [Article.id, Article.parent_id, Article.title, Article.url, tree.c.depth]
+        if include_content:
+            columns.append(Article.content)
+        stmt = (
+            select(*columns)
+            .join(tree, Article.id == tree.c.id)
+            .order_by(tree.c.depth, Article.created_at)
+        )
+        result: Result = await self.session.execute(stmt)
+        return list(result.all())
+
+    async def replace_links(self, links: Dict[uuid.UUID, List[str]], chunk_size: int = 10000) -> None:
+        """
+        Перезаписывает исходящие связи статей: id статьи -> ссылки в порядке на странице.
+        Связи других статей, ведущие на эти статьи по URL, получают их id
+        """
+        source_ids = list(links)
+        for start in range(0, len(source_ids), chunk_size):
+            chunk_ids = source_ids[start:start + chunk_size]
+            await self.session.execute(delete(ArticleLink).where(ArticleLink.source_id.in_(chunk_ids)))
+            await self.session.execute(ARTICLE_LINKS_RESOLVE, {"article_ids": chunk_ids})
+
+        edges = [
+            (source_id, url, position)
+            for source_id, urls in links.items()
+            for position, url in enumerate(urls)
+        ]
+        for start in range(0, len(edges), chunk_size):
+            chunk = edges[start:start + chunk_size]
+            await self.session.execute(
+                ARTICLE_LINKS_INSERT,
+                {
+                    "source_ids": [edge[0] for edge in chunk],
+                    "urls": [edge[1] for edge in chunk],
+                    "positions": [edge[2] for edge in chunk],
+                },
+            )
+
+    async def get_neighbours(self, article_id: uuid.UUID, direction: str, limit: int) -> List[Row]:
+        """
+        Соседи статьи в графе ссылок: ``out`` - на кого ссылается статья,
+        ``in`` - кто ссылается на неё, ``both`` - и те и другие
+        """
+        # Несколько URL (перенаправления) могут вести на одну статью - берётся первая ссылка
+        queries = []
+        if direction in ("out", "both"):
+            out_links = (
+                select(ArticleLink.target_id, func.min(ArticleLink.position).label("position"))
+                .where(ArticleLink.source_id == article_id, ArticleLink.target_id.is_not(None))
+                .group_by(ArticleLink.target_id)
+                .subquery()
+            )
+            queries.append(
+                select(
+                    Article.id, Article.title, Article.url,
+                    out_links.c.position, literal("out").label("direction"),
+                )
+                .join(out_links, out_links.c.target_id == Article.id)
+                .order_by(out_links.c.position)
+            )
+        if direction in ("in", "both"):
+            in_links = (
+                select(ArticleLink.source_id, func.min(ArticleLink.position).label("position"))
+                .where(ArticleLink.target_id == article_id)
+                .group_by(ArticleLink.source_id)
+                .subquery()
+            )
+            queries.append(
+                select(
+                    Article.id, Article.title, Article.url,
+                    in_links.c.position, literal("in").label("direction"),
+                )
+                .join(in_links, in_links.c.source_id == Article.id)
+                .order_by(Article.created_at)
+            )
+
+        # limit общий: для both входящие добирают то, что осталось после исходящих
+        rows = []
+        for stmt in queries:
+            if len(rows) >= limit:
+                break
+            result: Result = await self.session.execute(stmt.limit(limit - len(rows)))
+            rows.extend(result.all())
+        return rows
+
 
 class ArticleSummaryRepository(SQLAlchemyRepository):
     model = ArticleSummary
+
+    async def upsert_many(self, data: List[dict]) -> Dict[uuid.UUID, uuid.UUID]:
+        """ Сохраняет summary статей, заменяя уже существующие; ``created_at`` существующих не меняется """
+        now = datetime.utcnow()
+        rows = [{**row, "created_at": row.get("created_at") or now, "updated_at": now} for row in data]
+        return await self.add_or_get_many(
+            rows,
+            conflict_cols=["article_id"],
+            update_cols=["summary", "updated_at"],
+        )
+
+    async def get_updated_at(self, url: str) -> Optional[Row]:
+        """ Id статьи по URL и время последней записи её summary; ``None``, если summary нет """
+        result: Result = await self.session.execute(
+            select(ArticleSummary.article_id, ArticleSummary.updated_at).where(
+                ArticleSummary.article_id == _article_id_by_url(url)
+            )
+        )
+        return result.one_or_none()
+
+
+class ArticleAliasRepository(SQLAlchemyRepository):
+    model = ArticleAlias
+
+    async def upsert_many(self, aliases: Dict[str, str]) -> None:
+        """ Сохраняет псевдонимы ``URL -> канонический URL`` уже сохранённых статей """
+        if not aliases:
+            return
+        await self.session.execute(
+            ARTICLE_ALIASES_UPSERT,
+            {"urls": list(aliases), "canonical_urls": list(aliases.values())},
+        )
+        await self.session.execute(ARTICLE_LINKS_RESOLVE_ALIASES, {"urls": list(aliases)})
+
+
+async def _article_copy_records(
+    records: Union[Iterable[dict], AsyncIterable[dict]], links: Dict[str, List[str]]
+):
+    """
+    Превращает словари статей в кортежи в порядке колонок staging-таблицы.
+    Ссылки записей собираются в ``links``: URL статьи -> канонические URL ссылок
+    """
+    if not hasattr(records, "__aiter__"):
+        records = _aiter(records)
+    async for record in records:
+        record = {
+            **record,
+            "url": canonicalize_url(record["url"]),
+            "parent_url": canonicalize_url(record["parent_url"]) if record.get("parent_url") else None,
+            "fetched_at": record.get("fetched_at") or datetime.utcnow(),
+        }
+        if record.get("links") is not None:
+            links[record["url"]] = list(dict.fromkeys(canonicalize_url(link) for link in record["links"]))
+        yield tuple(record.get(column) for column in ARTICLE_STAGING_COLUMNS)
+
+
+async def _aiter(records: Iterable[dict]):
+    for record in records:
+        yield record
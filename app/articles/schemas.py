@@ -1,7 +1,9 @@
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from pydantic import UUID4, BaseModel, HttpUrl
+from pydantic import UUID4, BaseModel, Field, HttpUrl
+
+from core.config import settings
 
 
 class ArticleBaseSchema(BaseModel):
@@ -12,6 +14,7 @@ class ArticleBaseSchema(BaseModel):
 
 class ArticleCreateSchema(ArticleBaseSchema):
     parent_id: Optional[UUID4] = None
+    fetched_at: datetime = Field(default_factory=datetime.utcnow)
 
 
 class ArticleResponse(ArticleBaseSchema):
@@ -53,12 +56,105 @@ class GetSummaryResponse(BaseModel):
     created_at: datetime
 
 
+class ArticleTreeNode(BaseModel):
+    id: UUID4
+    title: str
+    url: str
+    content: Optional[str] = None
+    depth: int
+    children: List["ArticleTreeNode"] = []
+
+
+class ArticleNeighbourSchema(BaseModel):
+    id: UUID4
+    title: str
+    url: str
+    position: int
+    direction: Literal["in", "out"]
+
+
+class ArticleNeighboursResponse(BaseModel):
+    article_id: UUID4
+    url: str
+    neighbours: List[ArticleNeighbourSchema]
+
+
+class SummaryCacheStatsResponse(BaseModel):
+    size: int
+    maxsize: int
+    ttl: Optional[float] = None
+    hits: int
+    misses: int
+
+
 class WikiArticleSchema(BaseModel):
     title: str
     url: str
     content: str
+    links: List[str] = []
+    fetched_at: datetime = Field(default_factory=datetime.utcnow)
     children: List["WikiArticleSchema"]
 
 
+class CrawledArticleSchema(BaseModel):
+    """ Статья, полученная при обходе, без дочерних статей """
+
+    title: str
+    url: str
+    content: str
+    links: List[str] = []
+    fetched_at: datetime
+    depth: int
+    parent_url: Optional[str] = None
+
+
+class ConcurrencyChangeSchema(BaseModel):
+    at: datetime
+    previous_limit: int
+    limit: int
+    reason: str
+
+
+class CrawlerConcurrencyResponse(BaseModel):
+    limit: int
+    in_flight: int
+    min_limit: int
+    max_limit: int
+    successes: int
+    congestion_events: int
+    history: List[ConcurrencyChangeSchema]
+
+
+class StreamArticleEvent(BaseModel):
+    event: Literal["article"] = "article"
+    article_id: UUID4
+    url: str
+    title: str
+    depth: int
+    parent_url: Optional[str] = None
+
+
+class StreamSummaryEvent(BaseModel):
+    event: Literal["summary"] = "summary"
+    article_id: UUID4
+    summary: str
+
+
+class StreamErrorEvent(BaseModel):
+    event: Literal["error"] = "error"
+    detail: str
+
+
 class URLBodySchema(BaseModel):
     url: HttpUrl
+
+
+class BatchParseRequest(BaseModel):
+    urls: List[HttpUrl] = Field(min_length=1, max_length=settings.parser.batch_max_urls)
+    depth: int = Field(default=settings.parser.death, ge=1, le=settings.parser.death)
+
+
+class BatchParseItemResult(BaseModel):
+    url: str
+    article_id: Optional[UUID4] = None
+    error: Optional[str] = None
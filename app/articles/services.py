@@ -1,18 +1,31 @@
+import asyncio
 import logging
 from abc import ABC, abstractmethod
-from typing import Optional
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
 import g4f.models
+import httpx
 from g4f.client import AsyncClient as AsyncGPTClient
-from pydantic import UUID4
+from pydantic import UUID4, BaseModel
+from sqlalchemy import func, select
 
 import core.exceptions.articles as article_exceptions
-from articles.schemas import (ArticleCreateSchema, ArticleSummaryCreateSchema,
-                                  WikiArticleSchema)
+from articles.schemas import (ArticleCreateSchema, ArticleNeighboursResponse,
+                              ArticleNeighbourSchema, ArticleSummaryCreateSchema,
+                              ArticleTreeNode, BatchParseItemResult, GetSummaryResponse,
+                              StreamArticleEvent, StreamSummaryEvent,
+                              WikiArticleSchema)
 from core.config import settings
 from core.utils.summary_abstract import AbstractSummaryService
 from core.utils.unitofwork import IUnitOfWork
-from parsers.wiki_parser import parse_wikipedia_article
+from parsers.extractors import PageData
+from parsers.urls import canonicalize_url
+from parsers.wiki_parser import (PageCallback, StoreLookup, iter_wikipedia_articles,
+                                 parse_wikipedia_article, parse_wikipedia_articles)
+from summaries.services import summary_response_cache
+from summaries.worker import background_summarizer
 
 logger = logging.getLogger(settings.logger.logger_name)
 
@@ -26,123 +39,579 @@ class IArticleService(ABC):
         url: str,
         uow: IUnitOfWork,
         depth: int,
+        on_page: Optional[PageCallback] = None,
     ) -> str:
         ...
     
     @abstractmethod
-    async def get_article_summary_by_url(self, url: str, uow: IUnitOfWork):
+    async def parse_and_save_wiki_articles(
+        self,
+        urls: List[str],
+        uow: IUnitOfWork,
+        depth: int,
+        on_page: Optional[PageCallback] = None,
+    ) -> List[BatchParseItemResult]:
+        ...
+
+    @abstractmethod
+    def iter_parse_and_save_wiki_article(
+        self,
+        url: str,
+        uow: IUnitOfWork,
+        depth: int,
+    ) -> AsyncIterator[BaseModel]:
+        ...
+
+    @abstractmethod
+    async def get_article_summary_by_url(self, url: str, uow: IUnitOfWork) -> GetSummaryResponse:
+        ...
+
+    @abstractmethod
+    async def get_article_neighbours(
+        self,
+        url: str,
+        uow: IUnitOfWork,
+        direction: str = "both",
+        limit: int = 100,
+    ) -> ArticleNeighboursResponse:
+        ...
+
+    @abstractmethod
+    async def get_article_tree(
+        self,
+        url: str,
+        uow: IUnitOfWork,
+        depth: int,
+        include_content: bool = False,
+    ) -> ArticleTreeNode:
         ...
 
 
+@dataclass
+class _InFlightParse:
+    """ Выполняющийся парсинг: его результат и подписчики на ход обхода """
+
+    future: asyncio.Future
+    pages: List[Tuple[str, int]] = field(default_factory=list)
+    callbacks: List[PageCallback] = field(default_factory=list)
+
+    def on_page(self, url: str, level: int) -> None:
+        self.pages.append((url, level))
+        for callback in self.callbacks:
+            callback(url, level)
+
+    def subscribe(self, callback: PageCallback) -> None:
+        """ Подписывает на ход обхода, сначала передав уже полученные страницы """
+        for url, level in self.pages:
+            callback(url, level)
+        self.callbacks.append(callback)
+
+
 class ArticleService(IArticleService):
     """ Сервис для работы со статьями """
 
-    def __init__(self, summary_service: AbstractSummaryService):
+    # Выполняющиеся парсинги процесса: (канонический URL, глубина) -> парсинг
+    _in_flight: Dict[Tuple[str, int], _InFlightParse] = {}
+
+    def __init__(
+        self,
+        summary_service: AbstractSummaryService,
+        http_client: Optional[httpx.AsyncClient] = None,
+    ):
         self.summary_service = summary_service
+        self.http_client = http_client
 
-    async def _save_article_tree(
+    async def _save_article_forest(
         self,
-        article: WikiArticleSchema,
+        articles: List[WikiArticleSchema],
         uow: IUnitOfWork,
         parent_id: Optional[UUID4] = None,
-    ):
-        """ Рекурсивно сохраняет дерево статей в БД """
-        logger.debug("Saving article: %s", article.title)
+        descendants: Optional[List[Tuple[UUID4, int]]] = None,
+    ) -> Dict[str, UUID4]:
+        """
+        Сохраняет несколько деревьев статей, один запрос на уровень для всех деревьев.
+        В ``descendants`` добавляются (id, уровень) сохранённых дочерних статей
+        """
+        total = sum(self._count_articles(article) for article in articles)
+        if parent_id is None and total >= settings.db.copy_threshold:
+            logger.debug("Saving %r articles through COPY", total)
+            ids = await uow.articles.bulk_load(
+                record for article in articles for record in self._iter_copy_records(article)
+            )
+            nodes = [item for article in articles for item in self._iter_nodes(article)]
+            if descendants is not None:
+                descendants.extend((ids[node.url], level) for node, level in nodes if level > 1)
+            return {article.url: ids[article.url] for article in articles}
 
-        article_data = ArticleCreateSchema(
-            title=article.title,
-            url=article.url,
-            content=article.content,
-            parent_id=parent_id,
-        )
-        db_article = await uow.articles.add_or_get(
-            article_data.model_dump(),
-            conflict_cols=["url"],
-        )
-        await uow.flush()
-        logger.debug("Article saved to DB with ID: %s", db_article.id)
+        root_ids = {}
+        links = {}
+        level = [(article, parent_id) for article in articles]
+        level_number = 1
+        while level:
+            logger.debug("Saving %r articles of the next tree level", len(level))
+            rows = [
+                ArticleCreateSchema(
+                    title=node.title,
+                    url=node.url,
+                    content=node.content,
+                    parent_id=node_parent_id,
+                    fetched_at=node.fetched_at,
+                ).model_dump()
+                for node, node_parent_id in level
+            ]
+            ids = await uow.articles.add_or_refresh_many(rows)
+            if not root_ids:
+                root_ids = {article.url: ids[article.url] for article in articles}
+            elif descendants is not None:
+                descendants.extend((ids[node.url], level_number) for node, _ in level)
+            links.update((ids[node.url], node.links) for node, _ in level)
+
+            level = [
+                (child, ids[node.url]) for node, _ in level for child in node.children
+            ]
+            level_number += 1
+
+        # Связи пишутся после всех уровней, когда сохранены и дочерние статьи
+        await uow.articles.replace_links(links)
+
+        logger.debug("Article trees saved to DB, root article IDs: %s", root_ids)
+        return root_ids
+
+    @classmethod
+    def _count_articles(cls, article: WikiArticleSchema) -> int:
+        return 1 + sum(cls._count_articles(child) for child in article.children)
+
+    @classmethod
+    def _iter_nodes(
+        cls, article: WikiArticleSchema, level: int = 1
+    ) -> Iterator[Tuple[WikiArticleSchema, int]]:
+        yield article, level
+        for child in article.children:
+            yield from cls._iter_nodes(child, level + 1)
+
+    @classmethod
+    def _iter_copy_records(
+        cls, article: WikiArticleSchema, parent_url: Optional[str] = None
+    ) -> Iterator[dict]:
+        yield {
+            "url": article.url,
+            "title": article.title,
+            "content": article.content,
+            "links": article.links,
+            "fetched_at": article.fetched_at,
+            "parent_url": parent_url,
+        }
+        for child in article.children:
+            yield from cls._iter_copy_records(child, article.url)
 
-        # Сохраняем вложенные статьи
-        if article.children:
-            logger.debug("Saving %r child articles", len(article.children))
-            for child in article.children:
-                await self._save_article_tree(child, uow, db_article.id)
+    @staticmethod
+    def _stored_pages_lookup(uow: IUnitOfWork) -> Optional[StoreLookup]:
+        """
+        Позволяет парсеру брать свежие статьи из БД вместо повторной загрузки.
+        Ссылки берутся из ``article_links``; статья без сохранённых ссылок
+        загружается заново - для неё неизвестно, есть ли у неё ссылки
+        """
+        if not settings.parser.reuse_stored:
+            return None
 
-        return db_article
+        max_age = timedelta(seconds=settings.parser.stored_max_age)
+
+        async def lookup(urls: List[str]) -> Dict[str, PageData]:
+            articles = await uow.articles.get_fresh_by_urls(urls, max_age=max_age)
+            links = await uow.articles.get_links(list({article.id for article in articles.values()}))
+            return {
+                url: PageData(
+                    title=article.title,
+                    content=article.content or "",
+                    links=links[article.id],
+                    fetched_at=article.fetched_at,
+                    canonical_url=article.url,
+                )
+                for url, article in articles.items()
+                if article.id in links
+            }
+
+        return lookup
 
     async def parse_and_save_wiki_article(
-        self, url: str, uow: IUnitOfWork, depth: int = settings.parser.base_death
+        self,
+        url: str,
+        uow: IUnitOfWork,
+        depth: int = settings.parser.base_death,
+        on_page: Optional[PageCallback] = None,
+    ) -> str:
+        """
+        Парсит статью Википедии и сохраняет в БД.
+
+        Одновременные вызовы для одного URL и глубины выполняются один раз,
+        остальные вызовы получают тот же результат и ход обхода в ``on_page``.
+        """
+        url = canonicalize_url(url)
+        key = (url, depth)
+        while key in self._in_flight:
+            parse = self._in_flight[key]
+            logger.info("Joining in-flight parsing of %s, depth: %s", url, depth)
+            if on_page is not None:
+                parse.subscribe(on_page)
+            try:
+                return await asyncio.shield(parse.future)
+            except asyncio.CancelledError:
+                # Выполнявший парсинг запрос отменён - пробуем выполнить сами
+                if not parse.future.cancelled():
+                    raise
+            finally:
+                if on_page is not None:
+                    parse.callbacks.remove(on_page)
+
+        future = asyncio.get_running_loop().create_future()
+        # Исключение могут не забрать, если ожидающих не было
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        parse = _InFlightParse(future=future)
+        if on_page is not None:
+            parse.callbacks.append(on_page)
+        self._in_flight[key] = parse
+        try:
+            article_id = await self._parse_and_save(url, uow, depth, parse.on_page, lock_key=key)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(article_id)
+            return article_id
+        finally:
+            del self._in_flight[key]
+
+    async def _acquire_parse_lock(
+        self, url: str, uow: IUnitOfWork, lock_key: Tuple[str, int]
+    ) -> Optional[str]:
+        """
+        Берёт advisory lock PostgreSQL на парсинг URL до конца транзакции.
+        Если, пока ждали блокировку, статью распарсил другой процесс,
+        возвращает её id.
+        """
+        # Сравниваются updated_at summary до и после ожидания: по часам БД, а не процесса
+        before = await uow.article_summaries.get_updated_at(url)
+        await uow.query(
+            select(func.pg_advisory_xact_lock(func.hashtextextended(f"{lock_key[0]}|{lock_key[1]}", 0)))
+        )
+
+        after = await uow.article_summaries.get_updated_at(url)
+        if after is not None and after != before:
+            return str(after.article_id)
+        return None
+
+    async def _parse_and_save(
+        self,
+        url: str,
+        uow: IUnitOfWork,
+        depth: int,
+        on_page: Optional[PageCallback],
+        lock_key: Tuple[str, int],
     ) -> str:
-        """ Парсит статью Википедии и сохраняет в БД """
+        if settings.parser.coalesce_mode == "advisory_lock":
+            article_id = await self._acquire_parse_lock(url, uow, lock_key)
+            if article_id:
+                logger.info("Article %s was parsed by another worker, ID: %s", url, article_id)
+                await uow.commit()
+                return article_id
+
         logger.info("Starting parsing and saving article: %s, depth: %s", url, depth)
 
         # Парсим статью
-        parsed_article = await parse_wikipedia_article(url=url, depth=depth)
+        aliases = {}
+        parsed_article = await parse_wikipedia_article(
+            url=url,
+            depth=depth,
+            client=self.http_client,
+            store_lookup=self._stored_pages_lookup(uow),
+            on_page=on_page,
+            aliases=aliases,
+        )
         if not parsed_article:
             logger.error("Failed to parse article: %s", url)
             raise article_exceptions.FailedParsingException(url=url)
 
         logger.info("Article successfully parsed: %s", parsed_article.title)
 
-        db_article = await self._save_article_tree(parsed_article, uow)
-        logger.info("Article tree saved to DB, root article ID: %s", db_article.id)
+        descendants = []
+        root_ids = await self._save_article_forest([parsed_article], uow, descendants=descendants)
+        article_id = root_ids[parsed_article.url]
+        await uow.article_aliases.upsert_many(aliases)
+        logger.info("Article tree saved to DB, root article ID: %s", article_id)
 
+        await self._summarize_and_save(article_id, parsed_article.url, parsed_article.content, uow)
+        background_summarizer.submit_many(descendants)
+        return str(article_id)
+
+    async def _summarize_and_save(self, article_id: UUID4, url: str, text: str, uow: IUnitOfWork) -> str:
+        """ Генерирует summary исходной статьи и сохраняет его вместе с остальными изменениями """
         # Генерируем summary только для исходной статьи
         logger.info("Generating summary for root article")
-        summary_text = await self.summary_service.generate_summary(
-            text=parsed_article.content
-        )
+        summary_text = await self.summary_service.generate_summary(text=text)
 
         summary_data = ArticleSummaryCreateSchema(
-            article_id=db_article.id, summary=summary_text
+            article_id=article_id, summary=summary_text
         )
-        await uow.article_summaries.add(summary_data.model_dump())
+        await uow.article_summaries.upsert_many([summary_data.model_dump()])
         await uow.commit()
-        logger.info("Summary saved to DB for article ID: %s", db_article.id)
+        summary_response_cache.pop(canonicalize_url(url))
+        logger.info("Summary saved to DB for article ID: %s", article_id)
+        return summary_text
+
+    async def parse_and_save_wiki_articles(
+        self,
+        urls: List[str],
+        uow: IUnitOfWork,
+        depth: int = settings.parser.base_death,
+        on_page: Optional[PageCallback] = None,
+    ) -> List[BatchParseItemResult]:
+        """
+        Парсит несколько статей Википедии за один обход с общим множеством
+        посещённых статей и сохраняет их деревья пакетно, по уровням.
+        Summary исходных статей генерируются параллельно, с ограничением.
+        """
+        urls = list(dict.fromkeys(urls))
+        logger.info("Starting batch parsing of %s articles, depth: %s", len(urls), depth)
+
+        aliases = {}
+        parsed = await parse_wikipedia_articles(
+            urls=urls,
+            depth=depth,
+            client=self.http_client,
+            store_lookup=self._stored_pages_lookup(uow),
+            on_page=on_page,
+            aliases=aliases,
+        )
+        # Разные исходные URL могут оказаться одной статьёй
+        articles = list({article.url: article for article in parsed.values() if article is not None}.values())
+        logger.info("Batch parsed: %s of %s articles", len(articles), len(urls))
+
+        article_ids = {}
+        if articles:
+            descendants = []
+            article_ids = await self._save_article_forest(articles, uow, descendants=descendants)
+            await uow.article_aliases.upsert_many(aliases)
+            await uow.commit()
+            logger.info("Saved %s article trees to DB", len(article_ids))
+            background_summarizer.submit_many(descendants)
+
+        semaphore = asyncio.Semaphore(settings.summary.batch_concurrency)
+
+        async def summarize(article: WikiArticleSchema) -> str:
+            async with semaphore:
+                return await self.summary_service.generate_summary(text=article.content)
+
+        summaries = await asyncio.gather(
+            *(summarize(article) for article in articles), return_exceptions=True
+        )
 
-        return str(db_article.id)
+        results = {}
+        summary_rows = []
+        for article, summary in zip(articles, summaries):
+            article_id = article_ids[article.url]
+            if isinstance(summary, BaseException):
+                logger.error("Failed to generate summary for %s: %s", article.url, summary)
+                detail = getattr(summary, "detail", "Failed to generate summary for article")
+                results[article.url] = BatchParseItemResult(
+                    url=article.url, article_id=article_id, error=str(detail)
+                )
+                continue
+            summary_rows.append(
+                ArticleSummaryCreateSchema(article_id=article_id, summary=summary).model_dump()
+            )
+            results[article.url] = BatchParseItemResult(url=article.url, article_id=article_id)
+
+        if summary_rows:
+            await uow.article_summaries.upsert_many(summary_rows)
+            await uow.commit()
+            for url in results:
+                summary_response_cache.pop(canonicalize_url(url))
+            logger.info("Saved %s summaries to DB", len(summary_rows))
+
+        return [
+            results[parsed[url].url].model_copy(update={"url": url})
+            if parsed.get(url)
+            else BatchParseItemResult(
+                url=url, error=article_exceptions.FailedParsingException(url=url).detail
+            )
+            for url in urls
+        ]
+
+    async def iter_parse_and_save_wiki_article(
+        self,
+        url: str,
+        uow: IUnitOfWork,
+        depth: int = settings.parser.base_death,
+    ) -> AsyncIterator[BaseModel]:
+        """
+        Парсит статью Википедии и связанные статьи, сохраняя и отдавая их
+        по уровням по мере загрузки. Последним событием отдаёт summary.
+        """
+        logger.info("Starting streaming parsing of article: %s, depth: %s", url, depth)
 
-    async def get_article_summary_by_url(self, url: str, uow: IUnitOfWork):
-        """ Получает summary статьи по URL """
+        url = canonicalize_url(url)
+        root_id = None
+        root_url = url
+        root_content = ""
+        parent_ids: Dict[str, UUID4] = {}
+        aliases: Dict[str, str] = {}
+        async for level in iter_wikipedia_articles(
+            url=url,
+            depth=depth,
+            client=self.http_client,
+            store_lookup=self._stored_pages_lookup(uow),
+            aliases=aliases,
+        ):
+            rows = [
+                ArticleCreateSchema(
+                    title=page.title,
+                    url=page.url,
+                    content=page.content,
+                    parent_id=parent_ids.get(page.parent_url),
+                    fetched_at=page.fetched_at,
+                ).model_dump()
+                for page in level
+            ]
+            ids = await uow.articles.add_or_refresh_many(rows)
+            # Ссылки уровня фиксируются вместе со статьями: прерванный обход не оставляет статей без ссылок
+            await uow.articles.replace_links({ids[page.url]: page.links for page in level})
+            await uow.commit()
+
+            if root_id is None:
+                root_id, root_url, root_content = ids[level[0].url], level[0].url, level[0].content
+            else:
+                background_summarizer.submit_many((ids[page.url], page.depth) for page in level)
+
+            for page in level:
+                yield StreamArticleEvent(
+                    article_id=ids[page.url],
+                    url=page.url,
+                    title=page.title,
+                    depth=page.depth,
+                    parent_url=page.parent_url,
+                )
+            parent_ids = ids
+
+        if root_id is None:
+            logger.error("Failed to parse article: %s", url)
+            raise article_exceptions.FailedParsingException(url=url)
+
+        await uow.article_aliases.upsert_many(aliases)
+        summary_text = await self._summarize_and_save(root_id, root_url, root_content, uow)
+        yield StreamSummaryEvent(article_id=root_id, summary=summary_text)
+
+    async def get_article_summary_by_url(self, url: str, uow: IUnitOfWork) -> GetSummaryResponse:
+        """ Получает summary статьи по URL, одним запросом или из кэша """
         logger.info("Getting article summary by URL: %s", url)
 
-        article = await uow.articles.get(url=url)
-        if not article:
+        cache_key = canonicalize_url(url)
+        cached = summary_response_cache.get(cache_key)
+        if cached is not None:
+            logger.debug("Summary response cache hit: %s", url)
+            return cached
+
+        row = await uow.articles.get_with_summary(url)
+        if not row:
             logger.warning("Article with URL %r not found in database", url)
             raise article_exceptions.ArticleNotFoundException(url=url)
 
-        logger.debug("Found article: %s (ID: %s)", article.title, article.id)
-
-        summary = await uow.article_summaries.get(article_id=article.id)
-        if not summary:
+        if row.summary is None:
             logger.warning("Summary for article %r not found", url)
+            background_summarizer.request(row.article_id)
             raise article_exceptions.SummaryNotFoundException(url=url)
 
-        logger.info("Summary successfully retrieved for article: %s", article.title)
-        return {
-            "article_id": article.id,
-            "title": article.title,
-            "url": article.url,
-            "summary": summary.summary,
-            "created_at": summary.created_at,
-        }
+        logger.info("Summary successfully retrieved for article: %s", row.title)
+        response = GetSummaryResponse.model_validate(row, from_attributes=True)
+        summary_response_cache.set(cache_key, response)
+        return response
+
+    async def get_article_tree(
+        self,
+        url: str,
+        uow: IUnitOfWork,
+        depth: int,
+        include_content: bool = False,
+    ) -> ArticleTreeNode:
+        """ Получает дерево сохранённых статей до заданной глубины одним запросом """
+        logger.info("Getting article tree by URL: %s, depth: %s", url, depth)
+
+        rows = await uow.articles.get_subtree(url, depth=depth, include_content=include_content)
+        if not rows:
+            logger.warning("Article with URL %r not found in database", url)
+            raise article_exceptions.ArticleNotFoundException(url=url)
+
+        # Строки упорядочены по уровню: родитель всегда раньше детей
+        nodes: Dict[UUID4, ArticleTreeNode] = {}
+        for row in rows:
+            node = ArticleTreeNode(
+                id=row.id,
+                title=row.title,
+                url=row.url,
+                content=row.content if include_content else None,
+                depth=row.depth,
+            )
+            nodes[row.id] = node
+            if row.depth > 1:
+                nodes[row.parent_id].children.append(node)
+
+        logger.info("Article tree retrieved: %s articles", len(nodes))
+        return nodes[rows[0].id]
+
+    async def get_article_neighbours(
+        self,
+        url: str,
+        uow: IUnitOfWork,
+        direction: str = "both",
+        limit: int = 100,
+    ) -> ArticleNeighboursResponse:
+        """ Получает статьи, связанные ссылками с заданной """
+        logger.info("Getting neighbours of article: %s, direction: %s", url, direction)
+
+        article = await uow.articles.get_by_url(url)
+        if not article:
+            logger.warning("Article with URL %r not found in database", url)
+            raise article_exceptions.ArticleNotFoundException(url=url)
+
+        rows = await uow.articles.get_neighbours(article.id, direction=direction, limit=limit)
+        return ArticleNeighboursResponse(
+            article_id=article.id,
+            url=article.url,
+            neighbours=[ArticleNeighbourSchema.model_validate(row, from_attributes=True) for row in rows],
+        )
 
 
 class FreeGPTSummaryService(AbstractSummaryService):
     """ Сервис для генерации summary """
 
+    model = "gpt-4o"
+    prompt = (
+        "Ты - эксперт по созданию кратких содержаний. "
+        "Только основная суть, без заголовков, без слова 'Summary', 'Краткое содержание' и т.п."
+        "Создай краткое содержание этого текста в несколько предложений (3-6):"
+    )
+
+    def summary_params(self, text: str) -> Dict[str, Any]:
+        return {
+            "service": "free_gpt",
+            "model": self.model,
+            "prompt": self.prompt,
+            "text": text[:settings.summary.max_text_length],
+            "max_tokens": settings.summary.max_tokens,
+            "temperature": settings.summary.temperature,
+        }
+
     async def generate_summary(self, text: str) -> str:
         """ Генерирует краткое содержание текста """
         logger.info("Starting summary generation")
         try:
             client = AsyncGPTClient()
             response = await client.chat.completions.create(
-                model="gpt-4o",
+                model=self.model,
                 messages=[
-                    {"role": "user", "content": f"Ты - эксперт по созданию кратких содержаний. "
-                                                f"Только основная суть, без заголовков, без слова 'Summary', 'Краткое содержание' и т.п."
-                                                f"Создай краткое содержание этого текста в несколько предложений (3-6):"
-                                                f"\n\n{text[:settings.summary.max_text_length]}"},
+                    {"role": "user", "content": f"{self.prompt}\n\n{text[:settings.summary.max_text_length]}"},
                 ],
                 max_tokens=settings.summary.max_tokens,
                 temperature=settings.summary.temperature,
@@ -1,37 +1,132 @@
 import logging
+from typing import AsyncIterator, Literal
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, HttpUrl
 
-from articles.schemas import GetSummaryResponse, ParseWikiResponse, URLBodySchema
+from articles.schemas import (ArticleNeighboursResponse, ArticleTreeNode,
+                              BatchParseRequest, CrawlerConcurrencyResponse,
+                              GetSummaryResponse, StreamErrorEvent,
+                              SummaryCacheStatsResponse, URLBodySchema)
 from core.config import settings
-from core.dependencies import ArticleServiceDep, UOWDep
+from core.dependencies import ArticleServiceDep, CrawlJobServiceDep, UOWDep
+from core.utils.unitofwork import UnitOfWork
+from jobs.schemas import CrawlJobResponse, JobStatus
+from parsers.fetcher import crawl_concurrency
+from summaries.services import summary_response_cache
 
 logger = logging.getLogger(settings.logger.logger_name)
 
 router = APIRouter(prefix=settings.api.prefix_api, tags=[settings.tags.tag_article])
 
 
-@router.post("/wiki/parse", response_model=ParseWikiResponse)
+@router.post(
+    "/wiki/parse",
+    response_model=CrawlJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
 async def parse_wiki_endpoint(
     body_url: URLBodySchema,
     uow: UOWDep,
-    article_service: ArticleServiceDep,
+    job_service: CrawlJobServiceDep,
 ):
     """
-    Эндпоинт для парсинга Wikipedia статьи и генерации summary
+    Эндпоинт для постановки в очередь парсинга Wikipedia статьи и генерации summary.
+    Статус задачи доступен по /wiki/jobs/{job_id}
     """
     logger.info(
         "Received parsing request for article: %s, depth: %s",
         body_url.url,
         settings.parser.death,
     )
-    article_id = await article_service.parse_and_save_wiki_article(
+    job_id = await job_service.enqueue(
         url=str(body_url.url),
-        uow=uow,
         depth=settings.parser.death,
+        uow=uow,
+    )
+    logger.info("Parsing job accepted, ID: %s", job_id)
+    return CrawlJobResponse(job_id=job_id, status=JobStatus.QUEUED)
+
+
+@router.post(
+    "/wiki/parse/batch",
+    response_model=CrawlJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def parse_wiki_batch_endpoint(
+    body: BatchParseRequest,
+    uow: UOWDep,
+    job_service: CrawlJobServiceDep,
+):
+    """
+    Эндпоинт для постановки в очередь парсинга нескольких Wikipedia статей за один обход.
+    ID статьи или ошибка для каждого исходного URL доступны по /wiki/jobs/{job_id}
+    """
+    logger.info(
+        "Received batch parsing request for %s articles, depth: %s",
+        len(body.urls),
+        body.depth,
+    )
+    job_id = await job_service.enqueue_batch(
+        urls=[str(url) for url in body.urls],
+        depth=body.depth,
+        uow=uow,
+    )
+    logger.info("Batch parsing job accepted, ID: %s", job_id)
+    return CrawlJobResponse(job_id=job_id, status=JobStatus.QUEUED)
+
+
+STREAM_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def _encode_event(event: BaseModel, stream_format: str) -> str:
+    data = event.model_dump_json()
+    if stream_format == "sse":
+        return f"event: {event.event}\ndata: {data}\n\n"
+    return f"{data}\n"
+
+
+@router.post("/wiki/parse/stream")
+async def parse_wiki_stream_endpoint(
+    body_url: URLBodySchema,
+    article_service: ArticleServiceDep,
+    stream_format: Literal["ndjson", "sse"] = Query("ndjson", alias="format"),
+):
+    """
+    Эндпоинт для парсинга Wikipedia статьи с потоковой выдачей результатов:
+    каждая статья отправляется сразу после загрузки и сохранения,
+    последним событием - summary исходной статьи
+    """
+    url = str(body_url.url)
+    logger.info(
+        "Received streaming parsing request for article: %s, depth: %s",
+        url,
+        settings.parser.death,
     )
-    logger.info(f"Article successfully processed, ID: %s", article_id)
-    return ParseWikiResponse(article_id=article_id)
+
+    async def events() -> AsyncIterator[str]:
+        # Сессия открывается внутри генератора: зависимости с yield
+        # закрываются до начала отправки потокового ответа
+        async with UnitOfWork() as uow:
+            try:
+                async for event in article_service.iter_parse_and_save_wiki_article(
+                    url=url,
+                    uow=uow,
+                    depth=settings.parser.death,
+                ):
+                    yield _encode_event(event, stream_format)
+            except HTTPException as e:
+                yield _encode_event(StreamErrorEvent(detail=str(e.detail)), stream_format)
+            except Exception as e:
+                logger.error("Streaming parsing of %s failed: %s", url, e, exc_info=True)
+                await uow.rollback()
+                yield _encode_event(StreamErrorEvent(detail="Internal Server Error"), stream_format)
+
+    return StreamingResponse(events(), media_type=STREAM_MEDIA_TYPES[stream_format])
 
 
 @router.post("/wiki/summary", response_model=GetSummaryResponse)
@@ -44,8 +139,65 @@ async def get_article_summary_endpoint(
     Эндпоинт для получения summary статьи по URL
     """
     logger.info("Received summary request for article: %s", body_url.url)
-    result = await article_service.get_article_summary_by_url(
+    return await article_service.get_article_summary_by_url(
         url=str(body_url.url),
         uow=uow,
     )
-    return GetSummaryResponse(**result)
+
+
+@router.get("/wiki/tree", response_model=ArticleTreeNode, response_model_exclude_none=True)
+async def get_article_tree_endpoint(
+    uow: UOWDep,
+    article_service: ArticleServiceDep,
+    url: HttpUrl,
+    # Сохранённое дерево может быть глубже одного обхода: обходы продолжают друг друга
+    depth: int = Query(settings.parser.death, ge=1, le=settings.parser.death * 2),
+    include_content: bool = False,
+):
+    """
+    Эндпоинт для получения сохранённого дерева статей до заданной глубины
+    """
+    logger.info("Received tree request for article: %s, depth: %s", url, depth)
+    return await article_service.get_article_tree(
+        url=str(url),
+        uow=uow,
+        depth=depth,
+        include_content=include_content,
+    )
+
+
+@router.get("/wiki/neighbours", response_model=ArticleNeighboursResponse)
+async def get_article_neighbours_endpoint(
+    uow: UOWDep,
+    article_service: ArticleServiceDep,
+    url: HttpUrl,
+    direction: Literal["in", "out", "both"] = "both",
+    limit: int = Query(100, ge=1, le=1000),
+):
+    """
+    Эндпоинт для получения статей, связанных ссылками с заданной:
+    out - на которые она ссылается, in - которые ссылаются на неё
+    """
+    logger.info("Received neighbours request for article: %s, direction: %s", url, direction)
+    return await article_service.get_article_neighbours(
+        url=str(url),
+        uow=uow,
+        direction=direction,
+        limit=limit,
+    )
+
+
+@router.get("/wiki/summary/cache", response_model=SummaryCacheStatsResponse)
+async def get_summary_cache_stats_endpoint():
+    """
+    Эндпоинт для мониторинга кэша ответов /wiki/summary: размер, попадания и промахи
+    """
+    return SummaryCacheStatsResponse(**summary_response_cache.stats())
+
+
+@router.get("/wiki/crawler/concurrency", response_model=CrawlerConcurrencyResponse)
+async def get_crawler_concurrency_endpoint():
+    """
+    Эндпоинт для мониторинга текущего лимита параллельных запросов краулера
+    """
+    return CrawlerConcurrencyResponse(**crawl_concurrency.stats())
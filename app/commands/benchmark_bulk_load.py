@@ -0,0 +1,93 @@
+"""
+Сравнение способов сохранения статей: построчный ``add_or_get``,
+пакетный ``add_or_refresh_many`` и COPY через ``bulk_load``.
+
+Все изменения откатываются. Запуск из каталога ``app``::
+
+    python -m commands.benchmark_bulk_load --rows 10000
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from typing import Awaitable, Callable, List
+
+from core.utils.unitofwork import UnitOfWork
+
+
+def make_records(rows: int, fan_out: int = 5) -> List[dict]:
+    """ Синтетическое дерево статей: у каждой статьи до ``fan_out`` детей """
+    prefix = f"https://bench.invalid/{uuid.uuid4().hex}/"
+    records = []
+    for i in range(rows):
+        parent = (i - 1) // fan_out if i else None
+        records.append(
+            {
+                "url": f"{prefix}{i}",
+                "title": f"Article {i}",
+                "content": "Lorem ipsum dolor sit amet. " * 40,
+                "links": [f"{prefix}{i * fan_out + j + 1}" for j in range(fan_out)],
+                "fetched_at": datetime.utcnow(),
+                "parent_url": f"{prefix}{parent}" if parent is not None else None,
+            }
+        )
+    return records
+
+
+async def per_row(uow, records: List[dict]) -> None:
+    ids = {}
+    for record in records:
+        data = {key: value for key, value in record.items() if key not in ("parent_url", "links")}
+        data["parent_id"] = ids.get(record["parent_url"])
+        article = await uow.articles.add_or_get(data, conflict_cols=["url"])
+        await uow.flush()
+        ids[record["url"]] = article.id
+    await uow.articles.replace_links({ids[record["url"]]: record["links"] for record in records})
+
+
+async def level_upsert(uow, records: List[dict]) -> None:
+    # Записи упорядочены так, что родитель всегда раньше ребёнка
+    ids = {}
+    level = [record for record in records if record["parent_url"] is None]
+    while level:
+        rows = []
+        for record in level:
+            data = {key: value for key, value in record.items() if key not in ("parent_url", "links")}
+            data["parent_id"] = ids.get(record["parent_url"])
+            rows.append(data)
+        ids.update(await uow.articles.add_or_refresh_many(rows))
+        urls = {record["url"] for record in level}
+        level = [record for record in records if record["parent_url"] in urls]
+    await uow.articles.replace_links({ids[record["url"]]: record["links"] for record in records})
+
+
+async def copy(uow, records: List[dict]) -> None:
+    await uow.articles.bulk_load(records)
+
+
+async def measure(name: str, func: Callable[..., Awaitable[None]], records: List[dict]) -> None:
+    async with UnitOfWork() as uow:
+        started_at = time.perf_counter()
+        await func(uow, records)
+        elapsed = time.perf_counter() - started_at
+        await uow.rollback()
+    print(f"{name:<14} {len(records):>8} rows  {elapsed:8.3f}s  {len(records) / elapsed:10.0f} rows/s")
+
+
+async def run(rows: int) -> None:
+    records = make_records(rows)
+    for name, func in (("per-row", per_row), ("level upsert", level_upsert), ("copy", copy)):
+        await measure(name, func, records)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark article persistence paths")
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+    asyncio.run(run(args.rows))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Импорт статей из JSON Lines файла через COPY.
+
+Каждая строка файла - объект с полями ``url``, ``title`` и, опционально,
+``content``, ``links``, ``fetched_at`` (ISO 8601) и ``parent_url``.
+
+Запуск из каталога ``app``::
+
+    python -m commands.import_articles articles.jsonl --batch-size 50000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List
+
+from core.utils.unitofwork import UnitOfWork
+
+
+def read_records(path: Path) -> Iterator[dict]:
+    with path.open(encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get("fetched_at"):
+                record["fetched_at"] = datetime.fromisoformat(record["fetched_at"])
+            yield record
+
+
+def batched(records: Iterator[dict], size: int) -> Iterator[List[dict]]:
+    while batch := list(islice(records, size)):
+        yield batch
+
+
+async def import_articles(path: Path, batch_size: int) -> int:
+    total = 0
+    started_at = time.perf_counter()
+    for batch in batched(read_records(path), batch_size):
+        async with UnitOfWork() as uow:
+            ids = await uow.articles.bulk_load(batch)
+            await uow.commit()
+        total += len(batch)
+        print(f"Imported {total} records ({len(ids)} articles in the last batch)")
+
+    print(f"Done: {total} records in {time.perf_counter() - started_at:.2f}s")
+    return total
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import articles from a JSON Lines file")
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Records per transaction")
+    args = parser.parse_args()
+    asyncio.run(import_articles(args.path, args.batch_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from pathlib import Path
-from typing import Literal
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel, PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -20,6 +20,7 @@ class ApiPrefix(BaseModel):
 
 class ApiTags(BaseModel):
     tag_article: str = "Articles"
+    tag_job: str = "Jobs"
 
 
 class DatabaseConfig(BaseModel):
@@ -30,6 +31,14 @@ class DatabaseConfig(BaseModel):
     echo_pool: bool = False
     pool_size: int = 50
     max_overflow: int = 10
+    copy_threshold: int = 2000  # С какого числа статей в дереве сохранять через COPY
+
+
+class HTTPClientConfig(BaseModel):
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0  # Секунды
+    http2: bool = False
 
 
 class ParserConfig(BaseModel):
@@ -37,13 +46,98 @@ class ParserConfig(BaseModel):
     base_death: int = 5
     death: int = 5
     timeout: int = 30  # Секунды
+    max_children: int = 5
+    # Общий лимит одновременных запросов всех обходов: начальное значение, подстраивается по AIMD
+    concurrency: int = 10
+    adaptive_concurrency: bool = True
+    min_concurrency: int = 2
+    max_concurrency: int = 50
+    latency_threshold: float = 2.0  # Секунды
+    rate_limit: float = 50  # Запросов в секунду на хост, 0 - без ограничения
+    rate_burst: int = 10
+    max_retries: int = 3
+    backoff_base: float = 0.5  # Секунды
+    backoff_max: float = 30  # Секунды
+    # Retry-After соблюдается целиком; если сервер просит ждать дольше, запрос завершается ошибкой
+    max_retry_after: float = 300  # Секунды
+    cache_enabled: bool = True
+    cache_path: str = ".cache/http_cache.sqlite3"  # Относительно BASE_DIR
+    cache_ttl: int = 3600  # Секунды, после - перепроверка через ETag / Last-Modified
+    cache_max_bytes: int = 512 * 1024 * 1024
+    reuse_stored: bool = True  # Брать из БД статьи, загруженные не раньше stored_max_age
+    stored_max_age: int = 24 * 3600  # Секунды
+    extractor: Literal["lxml", "bs4"] = "lxml"
+    # Объединение одновременных парсингов одного URL: в процессе или между процессами
+    coalesce_mode: Literal["local", "advisory_lock"] = "local"
+    executor: Literal["process", "thread", "inline"] = "process"
+    executor_workers: Optional[int] = None  # По умолчанию - по числу ядер
+    batch_max_urls: int = 500  # Исходных URL в одном пакетном запросе
+    # html - страницы статей, api - MediaWiki Action API (prop=extracts|links) пакетами
+    backend: Literal["html", "api"] = "html"
+    api_url: Optional[str] = None  # По умолчанию https://<хост статьи>/w/api.php
+    api_batch_size: int = 50  # Названий в одном запросе, не больше 50 у MediaWiki
+    # Только вводный раздел: тексты приходят вместе со ссылками, иначе - отдельным запросом на статью
+    api_intro_only: bool = True
+    # Вариант страницы для backend=html: full - страница целиком,
+    # render - только содержимое статьи (action=render), mobile - мобильная версия
+    page_variant: Literal["full", "render", "mobile"] = "full"
+    max_page_bytes: Optional[int] = 10 * 1024 * 1024  # Тело ответа после распаковки, None - без ограничения
+
+
+class JobsConfig(BaseModel):
+    workers: int = 4
+    progress_interval: float = 2.0  # Секунды
+    stale_after: int = 600  # Секунды без отчёта, после которых задача перезапускается
+
+
+# Только реализованные провайдеры: неизвестное имя - ошибка конфигурации при старте
+SummaryProviderName = Literal["free_gpt", "local"]
+
+
+class SummaryProviderConfig(BaseModel):
+    name: SummaryProviderName
+    timeout: Optional[float] = 30.0  # Секунды
 
 
 class SummaryConfig(BaseModel):
-    provider: Literal["free_gpt", "openai", "deepseek"] = "free_gpt"
+    provider: SummaryProviderName = "free_gpt"
+    # Цепочка провайдеров по порядку, пусто - только provider с provider_timeout.
+    # Например: [{"name": "free_gpt", "timeout": 20}, {"name": "local", "timeout": 5}]
+    providers: List[SummaryProviderConfig] = []
+    provider_timeout: Optional[float] = 30.0  # Секунды
+    hedge_delay: Optional[float] = 10.0  # Через сколько секунд звать следующий провайдер параллельно
+    breaker_failures: int = 3  # Ошибок подряд до размыкания circuit breaker
+    breaker_reset_timeout: float = 60.0  # Секунды до пробного вызова
+    # Запасной провайдер при ошибке или превышении latency_budget, None - без него
+    fallback_provider: Optional[Literal["local"]] = "local"
+    latency_budget: Optional[float] = 60.0  # Секунды
     max_text_length: int = 3000
     max_tokens: int = 200
     temperature: float = 0.3
+    batch_concurrency: int = 5  # Одновременных генераций при пакетном парсинге
+    # Кэш summary по хэшу входного текста, модели и параметров
+    cache_enabled: bool = True
+    cache_size: int = 1024  # Записей в памяти процесса
+    cache_persistent: bool = True  # Хранить summary в таблице summary_cache
+    # Map-reduce summary длинных статей вместо обрезки до max_text_length
+    chunked: bool = False
+    chunk_tokens: int = 700
+    chars_per_token: float = 3.0  # Оценка для русского текста
+    chunk_concurrency: int = 4
+    max_chunks: int = 16
+    # Локальный экстрактивный summary (TextRank)
+    local_sentences: int = 5
+    local_max_sentences: int = 500
+    # Фоновая генерация summary дочерних статей
+    background_enabled: bool = True
+    background_workers: int = 2
+    background_rate: float = 0.5  # Генераций в секунду, 0 - без ограничения
+    background_burst: int = 2
+    background_max_queued: int = 10000
+    background_backfill_limit: int = 1000  # Статей без summary, добавляемых при старте
+    # Кэш ответов /wiki/summary в памяти процесса
+    response_cache_size: int = 10000
+    response_cache_ttl: Optional[float] = 300.0  # Секунды
 
 
 class LoggerConfig(BaseModel):
@@ -71,12 +165,18 @@ class Settings(BaseSettings):
     # Logging
     logger: LoggerConfig = LoggerConfig()
 
+    # HTTP client
+    http: HTTPClientConfig = HTTPClientConfig()
+
     # Parsing
     parser: ParserConfig = ParserConfig()
     
     # Summary
     summary: SummaryConfig = SummaryConfig()
 
+    # Background jobs
+    jobs: JobsConfig = JobsConfig()
+
     model_config = SettingsConfigDict(
         case_sensitive=False,
         env_file=(
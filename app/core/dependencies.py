@@ -1,11 +1,19 @@
 from typing import Annotated
 
+import httpx
 from fastapi import Depends
 
 from articles.services import ArticleService, FreeGPTSummaryService, IArticleService
-from core.config import settings
+from core.config import SummaryProviderConfig, settings
+from core.utils.http_client import http_helper
 from core.utils.unitofwork import IUnitOfWork, UnitOfWork
 from core.utils.summary_abstract import AbstractSummaryService
+from jobs.services import CrawlJobService
+from jobs.worker import crawl_job_pool
+from summaries.services import (CachedSummaryService, ChunkedSummaryService,
+                                FallbackSummaryService, SummaryProvider,
+                                SummaryProviderChain, TextRankSummaryService,
+                                get_summary_breaker, summary_memory_cache)
 
 
 async def get_uow():
@@ -13,27 +21,63 @@ async def get_uow():
         yield uow
 
 
+def get_http_client() -> httpx.AsyncClient:
+    return http_helper.client
+
+
 def get_summary_service() -> AbstractSummaryService:
-    provider = settings.summary.provider
-    
+    providers = settings.summary.providers or [
+        SummaryProviderConfig(name=settings.summary.provider, timeout=settings.summary.provider_timeout)
+    ]
+    service = SummaryProviderChain(
+        [
+            SummaryProvider(
+                name=provider.name,
+                service=_get_provider_summary_service(provider.name),
+                timeout=provider.timeout,
+                breaker=get_summary_breaker(provider.name),
+            )
+            for provider in providers
+        ],
+        hedge_delay=settings.summary.hedge_delay,
+    )
+    if settings.summary.chunked:
+        service = ChunkedSummaryService(service)
+    if settings.summary.cache_enabled:
+        service = CachedSummaryService(service, summary_memory_cache)
+
+    # Запасной провайдер снаружи кэша: его результаты не попадают в кэш основного.
+    # Ответы не первых провайдеров цепочки CachedSummaryService не кэширует сам
+    fallback = settings.summary.fallback_provider
+    if fallback and fallback != settings.summary.provider:
+        service = FallbackSummaryService(service, _get_provider_summary_service(fallback))
+    return service
+
+
+def _get_provider_summary_service(provider: str) -> AbstractSummaryService:
     if provider == "free_gpt":
         return FreeGPTSummaryService()
-    # В будущем можно добавить другие провайдеры:
-    # elif provider == "openai":
-    #     return OpenAISummaryService()
-    # elif provider == "local":
-    #     return LocalSummaryService()
-    else:
-        # Fallback к FreeGPT
-        return FreeGPTSummaryService()
+    elif provider == "local":
+        return TextRankSummaryService()
+    # Новый провайдер добавляется сюда и в SummaryProviderName
+    raise ValueError(f"Unknown summary provider: {provider}")
 
 
 def get_article_service(
     summary_service: AbstractSummaryService = Depends(get_summary_service),
+    http_client: httpx.AsyncClient = Depends(get_http_client),
 ) -> IArticleService:
-    return ArticleService(summary_service)
+    return ArticleService(summary_service, http_client)
+
+
+def get_crawl_job_service() -> CrawlJobService:
+    return CrawlJobService(crawl_job_pool)
 
 
 UOWDep = Annotated[IUnitOfWork, Depends(get_uow)]
 
+HTTPClientDep = Annotated[httpx.AsyncClient, Depends(get_http_client)]
+
 ArticleServiceDep = Annotated[IArticleService, Depends(get_article_service)]
+
+CrawlJobServiceDep = Annotated[CrawlJobService, Depends(get_crawl_job_service)]
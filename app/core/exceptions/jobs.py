@@ -0,0 +1,10 @@
+from fastapi import HTTPException, status
+from pydantic import UUID4
+
+
+class JobNotFoundException(HTTPException):
+    def __init__(self, job_id: UUID4):
+        super().__init__(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job {job_id} not found",
+        )
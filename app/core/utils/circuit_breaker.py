@@ -0,0 +1,63 @@
+import logging
+import time
+from typing import Optional
+
+from core.config import settings
+
+logger = logging.getLogger(settings.logger.logger_name)
+
+
+class CircuitBreaker:
+    """
+    Размыкается после ``failure_threshold`` ошибок подряд и не пропускает
+    вызовы ``reset_timeout`` секунд. Затем пропускает один пробный вызов:
+    успех замыкает цепь, ошибка снова размыкает её.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "open" or self._trial:
+            return False
+        self._trial = True
+        return True
+
+    def release(self) -> None:
+        """ Вызов отменён, не успев завершиться: его результат не учитывается """
+        self._trial = False
+
+    def record_success(self) -> None:
+        if self.opened_at is not None:
+            logger.info("Circuit breaker %r closed", self.name)
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            logger.warning(
+                "Circuit breaker %r opened after %s failures for %ss",
+                self.name,
+                self.failures,
+                self.reset_timeout,
+            )
@@ -0,0 +1,61 @@
+import logging
+from typing import Optional
+
+import httpx
+
+from core.config import settings
+
+logger = logging.getLogger(settings.logger.logger_name)
+
+
+class HTTPClientHelper:
+    """ Держит общий для приложения пул HTTP-соединений """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 5.0,
+        http2: bool = False,
+        timeout: float = 30,
+    ) -> None:
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self.timeout = timeout
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self.start()
+        return self._client
+
+    def start(self) -> None:
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+                http2 = False
+
+        logger.debug("Creating shared HTTP client (http2=%s, limits=%s)", http2, self.limits)
+        self._client = httpx.AsyncClient(limits=self.limits, http2=http2, timeout=self.timeout)
+
+    async def dispose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+http_helper = HTTPClientHelper(
+    max_connections=settings.http.max_connections,
+    max_keepalive_connections=settings.http.max_keepalive_connections,
+    keepalive_expiry=settings.http.keepalive_expiry,
+    http2=settings.http.http2,
+    timeout=settings.parser.timeout,
+)
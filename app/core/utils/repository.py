@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Sequence, Type, TypeVar
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List, Optional, Sequence, Type, TypeVar, Union
 
-from sqlalchemy import Result, insert, select, update
+from sqlalchemy import ColumnElement, Result, insert, select, text, tuple_, union_all, update
 from sqlalchemy.dialects.postgresql import insert as psql_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -73,6 +73,97 @@ class SQLAlchemyRepository(AbstractRepository):
         filter_kwargs = {c: data[c] for c in conflict_cols if c in data}
         return await self.get(**filter_kwargs)
 
+    async def add_or_get_many(
+        self,
+        data: List[dict],
+        *,
+        conflict_cols: Optional[Sequence[str]] = None,
+        update_cols: Optional[Sequence[str]] = None,
+        update_where: Optional[Callable[[Any], ColumnElement]] = None,
+        chunk_size: int = 1000,
+    ) -> Dict[Any, Any]:
+        """
+        Пакетный аналог ``add_or_get``: один запрос на ``chunk_size`` строк.
+
+        Возвращает словарь ``ключ конфликта -> id`` для всех строк, включая уже
+        существовавшие. Если заданы ``update_cols``, существующие строки
+        обновляются (при выполнении ``update_where(excluded)``).
+        """
+        if not conflict_cols:
+            conflict_cols = [
+                col.name for col in self.model.__table__.primary_key.columns
+            ]
+        table = self.model.__table__
+
+        def key_of(row) -> Any:
+            values = tuple(row[c] for c in conflict_cols)
+            return values[0] if len(values) == 1 else values
+
+        # В одном INSERT ... ON CONFLICT ключ не может встречаться дважды
+        unique_rows = list({key_of(row): row for row in reversed(data)}.values())[::-1]
+
+        ids = {}
+        for start in range(0, len(unique_rows), chunk_size):
+            chunk = unique_rows[start:start + chunk_size]
+            stmt = psql_insert(self.model).values(chunk)
+            if update_cols:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=list(conflict_cols),
+                    set_={c: stmt.excluded[c] for c in update_cols},
+                    where=update_where(stmt.excluded) if update_where else None,
+                )
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_cols))
+
+            key_cols = [table.c[c] for c in conflict_cols]
+            inserted = stmt.returning(*key_cols, table.c.id).cte("inserted")
+            inserted_keys = [inserted.c[c] for c in conflict_cols]
+
+            # Строки, которых не коснулся INSERT, видны в исходном состоянии таблицы
+            existing = select(*key_cols, table.c.id).where(
+                tuple_(*key_cols).in_([tuple(row[c] for c in conflict_cols) for row in chunk]),
+                tuple_(*key_cols).not_in(select(*inserted_keys)),
+            )
+            result: Result = await self.session.execute(union_all(select(inserted), existing))
+            for row in result:
+                ids[key_of(row._mapping)] = row.id
+
+        return ids
+
+    async def copy_merge(
+        self,
+        records: Union[Iterable[tuple], AsyncIterable[tuple]],
+        *,
+        staging_columns: Dict[str, str],
+        merge_statements: Sequence[str],
+        staging_table: str = "staging",
+    ) -> Result:
+        """
+        Загрузка больших объёмов через бинарный COPY asyncpg.
+
+        Строки потоково заливаются во временную таблицу ``staging_table`` с
+        колонками ``staging_columns`` (имя -> тип PostgreSQL), после чего по
+        очереди выполняются ``merge_statements``, переносящие их в таблицу
+        модели. Возвращает результат последнего из них.
+        """
+        # Таблица создаётся через сессию: так адаптер asyncpg открывает транзакцию
+        # до COPY, иначе ON COMMIT DROP удалил бы её сразу после создания.
+        # DROP - на случай нескольких загрузок в одной транзакции
+        columns_sql = ", ".join(f"{name} {type_}" for name, type_ in staging_columns.items())
+        await self.session.execute(text(f"DROP TABLE IF EXISTS {staging_table}"))
+        await self.session.execute(text(f"CREATE TEMP TABLE {staging_table} ({columns_sql}) ON COMMIT DROP"))
+
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            staging_table, records=records, columns=list(staging_columns)
+        )
+
+        result = None
+        for statement in merge_statements:
+            result = await self.session.execute(text(statement))
+        return result
+
     async def add_many(self, data: list) -> Sequence[Type[T]]:
         stmt = insert(self.model).values(data).returning(self.model)
         result: Result = await self.session.execute(stmt)
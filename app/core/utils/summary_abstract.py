@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Any, Dict, Optional
 
 
 class AbstractSummaryService(ABC):
@@ -8,3 +8,10 @@ class AbstractSummaryService(ABC):
     @abstractmethod
     async def generate_summary(self, text: str) -> str:
         ...
+
+    def summary_params(self, text: str) -> Dict[str, Any]:
+        """
+        Всё, от чего зависит результат ``generate_summary``: входной текст,
+        модель и параметры. Используется как ключ кэша summary
+        """
+        return {"service": type(self).__name__, "text": text}
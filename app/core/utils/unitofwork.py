@@ -4,9 +4,12 @@ from abc import ABC, abstractmethod
 from fastapi import HTTPException
 from sqlalchemy import Result, Select
 
-from articles.repositories import ArticleRepository, ArticleSummaryRepository
+from articles.repositories import (ArticleAliasRepository, ArticleRepository,
+                                   ArticleSummaryRepository)
 from core.config import settings
 from core.db.db_helper import db_helper
+from jobs.repositories import CrawlJobRepository
+from summaries.repositories import SummaryCacheRepository
 
 logger = logging.getLogger(settings.logger.logger_name)
 
@@ -14,6 +17,9 @@ logger = logging.getLogger(settings.logger.logger_name)
 class IUnitOfWork(ABC):
     articles: ArticleRepository
     article_summaries: ArticleSummaryRepository
+    article_aliases: ArticleAliasRepository
+    crawl_jobs: CrawlJobRepository
+    summary_cache: SummaryCacheRepository
 
     @abstractmethod
     def __init__(self): ...
@@ -46,6 +52,9 @@ class UnitOfWork:
 
         self.articles = ArticleRepository(self.session)
         self.article_summaries = ArticleSummaryRepository(self.session)
+        self.article_aliases = ArticleAliasRepository(self.session)
+        self.crawl_jobs = CrawlJobRepository(self.session)
+        self.summary_cache = SummaryCacheRepository(self.session)
 
         return self
 
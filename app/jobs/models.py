@@ -0,0 +1,31 @@
+import uuid
+from datetime import datetime
+from typing import List, Optional
+
+from sqlalchemy import DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.db.mixins import CreatedAtMixin, UUIDIdIndexMixin
+from core.models import Base
+
+
+class CrawlJob(Base, UUIDIdIndexMixin, CreatedAtMixin):
+
+    # У пакетной задачи - первая исходная статья, все исходные статьи - в urls
+    url: Mapped[str] = mapped_column(String(1024), nullable=False)
+    urls: Mapped[Optional[List[str]]] = mapped_column(ARRAY(String(1024)), nullable=True)
+    depth: Mapped[int] = mapped_column(Integer, nullable=False)
+    # queued, running, done, failed
+    status: Mapped[str] = mapped_column(String(16), nullable=False, index=True)
+    pages_fetched: Mapped[int] = mapped_column(Integer, default=0)
+    depth_reached: Mapped[int] = mapped_column(Integer, default=0)
+    article_id: Mapped[Optional[uuid.UUID]] = mapped_column(
+        ForeignKey("articles.id"), nullable=True
+    )
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    # Результаты пакетной задачи по исходным статьям
+    results: Mapped[Optional[list]] = mapped_column(JSONB, nullable=True)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
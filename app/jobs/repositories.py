@@ -0,0 +1,41 @@
+import uuid
+from datetime import datetime
+from typing import List, Sequence
+
+from sqlalchemy import Result, select, update
+
+from core.utils.repository import SQLAlchemyRepository
+from jobs.models import CrawlJob
+from jobs.schemas import JobStatus
+
+
+class CrawlJobRepository(SQLAlchemyRepository):
+    model = CrawlJob
+
+    async def requeue_stale(self, stale_before: datetime) -> List[uuid.UUID]:
+        """
+        Возвращает в очередь задачи, чей обработчик перестал отчитываться
+        (например, после перезапуска), и отдаёт id всех ожидающих задач.
+        """
+        await self.session.execute(
+            update(CrawlJob)
+            .where(
+                CrawlJob.status == JobStatus.RUNNING,
+                CrawlJob.updated_at < stale_before,
+            )
+            .values(status=JobStatus.QUEUED, updated_at=datetime.utcnow())
+        )
+        result: Result = await self.session.execute(
+            select(CrawlJob.id)
+            .where(CrawlJob.status == JobStatus.QUEUED)
+            .order_by(CrawlJob.created_at)
+        )
+        return list(result.scalars().all())
+
+    async def requeue(self, job_ids: Sequence[uuid.UUID]) -> None:
+        """ Возвращает в очередь выполнявшиеся задачи, например прерванные при остановке """
+        await self.session.execute(
+            update(CrawlJob)
+            .where(CrawlJob.id.in_(job_ids), CrawlJob.status == JobStatus.RUNNING)
+            .values(status=JobStatus.QUEUED, started_at=None, updated_at=datetime.utcnow())
+        )
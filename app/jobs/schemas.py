@@ -0,0 +1,45 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import UUID4, BaseModel, ConfigDict
+
+from articles.schemas import BatchParseItemResult
+
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+
+class CrawlJobCreateSchema(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+
+    url: str
+    urls: Optional[List[str]] = None
+    depth: int
+    status: JobStatus = JobStatus.QUEUED
+
+
+class CrawlJobResponse(BaseModel):
+    job_id: UUID4
+    status: JobStatus
+    message: str = "Article parsing job accepted"
+
+
+class CrawlJobStatusResponse(BaseModel):
+    job_id: UUID4
+    url: str
+    urls: Optional[List[str]] = None
+    depth: int
+    status: JobStatus
+    pages_fetched: int
+    depth_reached: int
+    article_id: Optional[UUID4] = None
+    error: Optional[str] = None
+    results: Optional[List[BatchParseItemResult]] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -0,0 +1,59 @@
+import logging
+from typing import List
+
+from pydantic import UUID4
+
+import core.exceptions.jobs as job_exceptions
+from core.config import settings
+from core.utils.unitofwork import IUnitOfWork
+from jobs.schemas import CrawlJobCreateSchema, CrawlJobStatusResponse
+from jobs.worker import CrawlJobWorkerPool
+
+logger = logging.getLogger(settings.logger.logger_name)
+
+
+class CrawlJobService:
+    """ Сервис для фоновых задач парсинга """
+
+    def __init__(self, pool: CrawlJobWorkerPool):
+        self.pool = pool
+
+    async def enqueue(self, url: str, depth: int, uow: IUnitOfWork) -> UUID4:
+        """ Создаёт задачу парсинга и ставит её в очередь """
+        job_id = await self._enqueue(CrawlJobCreateSchema(url=url, depth=depth), uow)
+        logger.info("Crawl job %s enqueued for %s", job_id, url)
+        return job_id
+
+    async def enqueue_batch(self, urls: List[str], depth: int, uow: IUnitOfWork) -> UUID4:
+        """ Создаёт одну задачу на парсинг нескольких статей за общий обход и ставит её в очередь """
+        job_id = await self._enqueue(CrawlJobCreateSchema(url=urls[0], urls=urls, depth=depth), uow)
+        logger.info("Batch crawl job %s enqueued for %s articles", job_id, len(urls))
+        return job_id
+
+    async def _enqueue(self, job_data: CrawlJobCreateSchema, uow: IUnitOfWork) -> UUID4:
+        job = await uow.crawl_jobs.add(job_data.model_dump())
+        await uow.commit()
+
+        self.pool.submit(job.id)
+        return job.id
+
+    async def get_job_status(self, job_id: UUID4, uow: IUnitOfWork) -> CrawlJobStatusResponse:
+        job = await uow.crawl_jobs.get(job_id)
+        if not job:
+            raise job_exceptions.JobNotFoundException(job_id=job_id)
+
+        return CrawlJobStatusResponse(
+            job_id=job.id,
+            url=job.url,
+            urls=job.urls,
+            depth=job.depth,
+            status=job.status,
+            pages_fetched=job.pages_fetched,
+            depth_reached=job.depth_reached,
+            article_id=job.article_id,
+            error=job.error,
+            results=job.results,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+        )
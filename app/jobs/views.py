@@ -0,0 +1,24 @@
+import logging
+
+from fastapi import APIRouter
+from pydantic import UUID4
+
+from core.config import settings
+from core.dependencies import CrawlJobServiceDep, UOWDep
+from jobs.schemas import CrawlJobStatusResponse
+
+logger = logging.getLogger(settings.logger.logger_name)
+
+router = APIRouter(prefix=settings.api.prefix_api, tags=[settings.tags.tag_job])
+
+
+@router.get("/wiki/jobs/{job_id}", response_model=CrawlJobStatusResponse)
+async def get_job_status_endpoint(
+    job_id: UUID4,
+    uow: UOWDep,
+    job_service: CrawlJobServiceDep,
+):
+    """
+    Эндпоинт для получения статуса задачи парсинга
+    """
+    return await job_service.get_job_status(job_id=job_id, uow=uow)
@@ -0,0 +1,196 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Set
+
+from fastapi import HTTPException
+
+from articles.services import IArticleService
+from core.config import settings
+from core.utils.unitofwork import UnitOfWork
+from jobs.models import CrawlJob
+from jobs.schemas import JobStatus
+
+logger = logging.getLogger(settings.logger.logger_name)
+
+
+class JobProgress:
+    """ Ход выполнения задачи, обновляется парсером """
+
+    def __init__(self) -> None:
+        self.pages_fetched = 0
+        self.depth_reached = 0
+
+    def on_page(self, url: str, level: int) -> None:
+        self.pages_fetched += 1
+        self.depth_reached = max(self.depth_reached, level)
+
+    def as_values(self) -> dict:
+        return {
+            "pages_fetched": self.pages_fetched,
+            "depth_reached": self.depth_reached,
+            "updated_at": datetime.utcnow(),
+        }
+
+
+class CrawlJobWorkerPool:
+    """
+    Пул из ``workers`` обработчиков задач парсинга внутри процесса.
+
+    Задачи хранятся в таблице ``crawl_jobs``: при старте и затем каждые
+    ``stale_after / 2`` секунд пул подхватывает ожидающие задачи и задачи,
+    обработчик которых не отчитывался дольше ``stale_after`` секунд. Задача
+    захватывается переводом статуса ``queued -> running``, поэтому её выполнит
+    только один обработчик. Прерванные при остановке задачи возвращаются в очередь.
+    """
+
+    def __init__(self, workers: int, progress_interval: float, stale_after: int) -> None:
+        self.workers = workers
+        self.progress_interval = progress_interval
+        self.stale_after = stale_after
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._running: Set[uuid.UUID] = set()
+        self._pending: Set[uuid.UUID] = set()
+        self._service_factory: Optional[Callable[[], IArticleService]] = None
+
+    async def start(self, service_factory: Callable[[], IArticleService]) -> None:
+        self._service_factory = service_factory
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info("Started %s crawl job workers", self.workers)
+        await self._recover()
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def _recover(self) -> None:
+        """ Ставит в очередь ожидающие и зависшие задачи """
+        try:
+            async with UnitOfWork() as uow:
+                job_ids = await uow.crawl_jobs.requeue_stale(
+                    stale_before=datetime.utcnow() - timedelta(seconds=self.stale_after)
+                )
+                await uow.commit()
+        except Exception as e:
+            logger.error("Failed to recover crawl jobs: %s", e, exc_info=True)
+            return
+
+        # Задачу, поставленную и другим процессом, захватит только один обработчик
+        for job_id in job_ids:
+            self.submit(job_id)
+        if job_ids:
+            logger.info("Recovered %s pending crawl jobs", len(job_ids))
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.stale_after / 2)
+            await self._recover()
+
+    def submit(self, job_id: uuid.UUID) -> None:
+        if self._queue is None:
+            raise RuntimeError("Crawl job worker pool is not started")
+        if job_id in self._pending:
+            return
+        self._pending.add(job_id)
+        self._queue.put_nowait(job_id)
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        if self._running:
+            try:
+                async with UnitOfWork() as uow:
+                    await uow.crawl_jobs.requeue(list(self._running))
+                    await uow.commit()
+                logger.info("Returned %s interrupted crawl jobs to the queue", len(self._running))
+            except Exception as e:
+                logger.error("Failed to requeue interrupted crawl jobs: %s", e, exc_info=True)
+            self._running.clear()
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._pending.discard(job_id)
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error("Crawl job %s crashed: %s", job_id, e, exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: uuid.UUID) -> None:
+        now = datetime.utcnow()
+        async with UnitOfWork() as uow:
+            job = await uow.crawl_jobs.update(
+                job_id,
+                {"status": JobStatus.RUNNING, "started_at": now, "updated_at": now},
+                status=JobStatus.QUEUED,
+            )
+            await uow.commit()
+        if job is None:
+            logger.debug("Crawl job %s is already taken or missing", job_id)
+            return
+
+        logger.info("Running crawl job %s: %s, depth: %s", job_id, job.url, job.depth)
+        progress = JobProgress()
+        reporter = asyncio.create_task(self._report_progress(job_id, progress))
+        self._running.add(job_id)
+        try:
+            async with UnitOfWork() as uow:
+                if job.urls:
+                    values = await self._run_batch(job, uow, progress)
+                else:
+                    article_id = await self._service_factory().parse_and_save_wiki_article(
+                        url=job.url,
+                        uow=uow,
+                        depth=job.depth,
+                        on_page=progress.on_page,
+                    )
+                    values = {"status": JobStatus.DONE, "article_id": uuid.UUID(article_id)}
+                    logger.info("Crawl job %s done, article ID: %s", job_id, article_id)
+        except Exception as e:
+            error = e.detail if isinstance(e, HTTPException) else repr(e)
+            values = {"status": JobStatus.FAILED, "error": str(error)}
+            logger.error("Crawl job %s failed: %s", job_id, error)
+        finally:
+            reporter.cancel()
+
+        async with UnitOfWork() as uow:
+            await uow.crawl_jobs.update(
+                job_id, {**values, **progress.as_values(), "finished_at": datetime.utcnow()}
+            )
+            await uow.commit()
+        self._running.discard(job_id)
+
+    async def _run_batch(self, job: CrawlJob, uow: UnitOfWork, progress: JobProgress) -> dict:
+        """ Парсит исходные статьи пакетной задачи за один обход; ошибки отдельных статей - в результатах """
+        results = await self._service_factory().parse_and_save_wiki_articles(
+            urls=job.urls,
+            uow=uow,
+            depth=job.depth,
+            on_page=progress.on_page,
+        )
+        failed = sum(result.error is not None for result in results)
+        logger.info("Batch crawl job %s done, %s of %s articles failed", job.id, failed, len(results))
+        return {"status": JobStatus.DONE, "results": [result.model_dump(mode="json") for result in results]}
+
+    async def _report_progress(self, job_id: uuid.UUID, progress: JobProgress) -> None:
+        """ Периодически сохраняет ход задачи; заодно служит признаком жизни обработчика """
+        while True:
+            await asyncio.sleep(self.progress_interval)
+            try:
+                async with UnitOfWork() as uow:
+                    await uow.crawl_jobs.update(job_id, progress.as_values())
+                    await uow.commit()
+            except Exception as e:
+                logger.warning("Failed to save progress of crawl job %s: %s", job_id, e)
+
+
+crawl_job_pool = CrawlJobWorkerPool(
+    workers=settings.jobs.workers,
+    progress_interval=settings.jobs.progress_interval,
+    stale_after=settings.jobs.stale_after,
+)
@@ -8,8 +8,15 @@ from fastapi.middleware.cors import CORSMiddleware
 from articles.views import router as articles_router
 from core.config import settings
 from core.db import db_helper
+from core.dependencies import get_article_service, get_http_client, get_summary_service
 from core.utils.error_handlers import register_errors_handlers
+from core.utils.http_client import http_helper
 from core.utils.logger import setup_logger
+from jobs.views import router as jobs_router
+from jobs.worker import crawl_job_pool
+from parsers.executor import extraction_executor
+from parsers.fetcher import response_cache
+from summaries.worker import background_summarizer
 
 
 @asynccontextmanager
@@ -18,9 +25,22 @@ async def lifespan(app: FastAPI):
     setup_logger()
     logger = logging.getLogger(settings.logger.logger_name)
     logger.info("Application starting")
+    http_helper.start()
+    extraction_executor.start()
+    await crawl_job_pool.start(
+        service_factory=lambda: get_article_service(get_summary_service(), get_http_client())
+    )
+    if settings.summary.background_enabled:
+        await background_summarizer.start(service_factory=get_summary_service)
     yield
     # shutdown
     logger.info("Application shutting down")
+    await crawl_job_pool.stop()
+    await background_summarizer.stop()
+    await http_helper.dispose()
+    extraction_executor.dispose()
+    if response_cache is not None:
+        response_cache.dispose()
     await db_helper.dispose()
 
 
@@ -40,6 +60,7 @@ main_app.add_middleware(
 )
 
 main_app.include_router(articles_router)
+main_app.include_router(jobs_router)
 
 register_errors_handlers(app=main_app)
 
@@ -27,6 +27,8 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 from app.articles.models import *
+from app.jobs.models import *
+from app.summaries.models import *
 
 target_metadata = Base.metadata
 
@@ -0,0 +1,55 @@
+"""Article links
+
+Revision ID: 3a9e5f71c2b8
+Revises: f27b6d0c8e14
+Create Date: 2026-10-18 16:10:54.219846
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3a9e5f71c2b8"
+down_revision: Union[str, Sequence[str], None] = "f27b6d0c8e14"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "article_links",
+        sa.Column("source_id", sa.Uuid(), nullable=False),
+        sa.Column("target_url", sa.String(length=1024), nullable=False),
+        sa.Column("target_id", sa.Uuid(), nullable=True),
+        sa.Column("position", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["source_id"],
+            ["articles.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["target_id"],
+            ["articles.id"],
+        ),
+        sa.PrimaryKeyConstraint("source_id", "target_url"),
+    )
+    op.create_index(op.f("ix_article_links_target_id"), "article_links", ["target_id"], unique=False)
+    op.create_index(
+        "ix_article_links_unresolved",
+        "article_links",
+        ["target_url"],
+        unique=False,
+        postgresql_where=sa.text("target_id IS NULL"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "ix_article_links_unresolved", table_name="article_links", postgresql_where=sa.text("target_id IS NULL")
+    )
+    op.drop_index(op.f("ix_article_links_target_id"), table_name="article_links")
+    op.drop_table("article_links")
@@ -0,0 +1,38 @@
+"""Article fetched_at
+
+Revision ID: 5b1f0c2d9a7e
+Revises: 23277cc6ebdd
+Create Date: 2026-10-18 10:12:41.204518
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5b1f0c2d9a7e"
+down_revision: Union[str, Sequence[str], None] = "23277cc6ebdd"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "articles",
+        sa.Column(
+            "fetched_at",
+            sa.DateTime(),
+            server_default=sa.text("(now() at time zone 'utc')"),
+            nullable=False,
+        ),
+    )
+    op.execute("UPDATE articles SET fetched_at = created_at")
+    op.alter_column("articles", "fetched_at", server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("articles", "fetched_at")
@@ -0,0 +1,44 @@
+"""Article aliases
+
+Revision ID: 6e2b8d4f1a93
+Revises: 3a9e5f71c2b8
+Create Date: 2026-10-18 17:02:31.684205
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "6e2b8d4f1a93"
+down_revision: Union[str, Sequence[str], None] = "3a9e5f71c2b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "article_aliases",
+        sa.Column("url", sa.String(length=1024), nullable=False),
+        sa.Column("article_id", sa.Uuid(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["article_id"],
+            ["articles.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("url"),
+    )
+    op.create_index(op.f("ix_article_aliases_article_id"), "article_aliases", ["article_id"], unique=False)
+    op.create_index(op.f("ix_article_aliases_id"), "article_aliases", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_article_aliases_id"), table_name="article_aliases")
+    op.drop_index(op.f("ix_article_aliases_article_id"), table_name="article_aliases")
+    op.drop_table("article_aliases")
@@ -0,0 +1,51 @@
+"""Crawl jobs
+
+Revision ID: 8c3e4a1f7d20
+Revises: 5b1f0c2d9a7e
+Create Date: 2026-10-18 12:30:07.118342
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8c3e4a1f7d20"
+down_revision: Union[str, Sequence[str], None] = "5b1f0c2d9a7e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "crawl_jobs",
+        sa.Column("url", sa.String(length=1024), nullable=False),
+        sa.Column("depth", sa.Integer(), nullable=False),
+        sa.Column("status", sa.String(length=16), nullable=False),
+        sa.Column("pages_fetched", sa.Integer(), nullable=False),
+        sa.Column("depth_reached", sa.Integer(), nullable=False),
+        sa.Column("article_id", sa.Uuid(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("started_at", sa.DateTime(), nullable=True),
+        sa.Column("finished_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["article_id"],
+            ["articles.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(op.f("ix_crawl_jobs_id"), "crawl_jobs", ["id"], unique=False)
+    op.create_index(op.f("ix_crawl_jobs_status"), "crawl_jobs", ["status"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_crawl_jobs_status"), table_name="crawl_jobs")
+    op.drop_index(op.f("ix_crawl_jobs_id"), table_name="crawl_jobs")
+    op.drop_table("crawl_jobs")
@@ -0,0 +1,30 @@
+"""Article summaries updated_at
+
+Revision ID: b7e3f9a1c4d6
+Revises: 6e2b8d4f1a93
+Create Date: 2026-10-18 23:41:12.507391
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e3f9a1c4d6"
+down_revision: Union[str, Sequence[str], None] = "6e2b8d4f1a93"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("article_summaries", sa.Column("updated_at", sa.DateTime(), nullable=True))
+    op.execute("UPDATE article_summaries SET updated_at = created_at")
+    op.alter_column("article_summaries", "updated_at", nullable=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("article_summaries", "updated_at")
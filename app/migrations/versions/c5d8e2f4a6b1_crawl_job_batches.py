@@ -0,0 +1,31 @@
+"""Crawl job batches
+
+Revision ID: c5d8e2f4a6b1
+Revises: b7e3f9a1c4d6
+Create Date: 2026-10-18 23:58:40.231906
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "c5d8e2f4a6b1"
+down_revision: Union[str, Sequence[str], None] = "b7e3f9a1c4d6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("crawl_jobs", sa.Column("urls", postgresql.ARRAY(sa.String(length=1024)), nullable=True))
+    op.add_column("crawl_jobs", sa.Column("results", postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("crawl_jobs", "results")
+    op.drop_column("crawl_jobs", "urls")
@@ -0,0 +1,38 @@
+"""Summary cache
+
+Revision ID: d41a7c9e5b3f
+Revises: 8c3e4a1f7d20
+Create Date: 2026-10-18 14:05:42.506913
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d41a7c9e5b3f"
+down_revision: Union[str, Sequence[str], None] = "8c3e4a1f7d20"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "summary_cache",
+        sa.Column("key", sa.String(length=64), nullable=False),
+        sa.Column("summary", sa.Text(), nullable=False),
+        sa.Column("id", sa.Uuid(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("key"),
+    )
+    op.create_index(op.f("ix_summary_cache_id"), "summary_cache", ["id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_summary_cache_id"), table_name="summary_cache")
+    op.drop_table("summary_cache")
@@ -0,0 +1,27 @@
+"""Articles parent_id index
+
+Revision ID: f27b6d0c8e14
+Revises: d41a7c9e5b3f
+Create Date: 2026-10-18 15:22:19.730461
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f27b6d0c8e14"
+down_revision: Union[str, Sequence[str], None] = "d41a7c9e5b3f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f("ix_articles_parent_id"), "articles", ["parent_id"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_articles_parent_id"), table_name="articles")
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from core.config import settings
+
+logger = logging.getLogger(settings.logger.logger_name)
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    body: bytes
+    content_type: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.fetched_at < ttl
+
+
+class DiskResponseCache:
+    """
+    Персистентный кэш HTTP-ответов в SQLite.
+
+    Тела хранятся сжатыми вместе с валидаторами (ETag / Last-Modified).
+    При превышении ``max_bytes`` удаляются давно не использованные записи.
+    Все обращения к диску выполняются в отдельном потоке.
+    """
+
+    def __init__(self, path: Path, ttl: float, max_bytes: int) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " url TEXT PRIMARY KEY,"
+                " body BLOB NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " content_type TEXT,"
+                " etag TEXT,"
+                " last_modified TEXT,"
+                " fetched_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)")
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def _get(self, url: str) -> Optional[CachedResponse]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT body, content_type, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+        body, content_type, etag, last_modified, fetched_at = row
+        return CachedResponse(
+            url=url,
+            body=zlib.decompress(body),
+            content_type=content_type,
+            etag=etag,
+            last_modified=last_modified,
+            fetched_at=fetched_at,
+        )
+
+    def _put(self, entry: CachedResponse) -> None:
+        compressed = zlib.compress(entry.body)
+        with self._lock:
+            conn = self._connect()
+            previous = conn.execute("SELECT size FROM responses WHERE url = ?", (entry.url,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry.url,
+                    compressed,
+                    len(compressed),
+                    entry.content_type,
+                    entry.etag,
+                    entry.last_modified,
+                    entry.fetched_at,
+                    time.time(),
+                ),
+            )
+            self._total_bytes += len(compressed) - (previous[0] if previous else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict(conn)
+
+    def _touch(self, url: str) -> None:
+        with self._lock:
+            now = time.time()
+            self._connect().execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url)
+            )
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """ Удаляет самые старые по обращению записи, пока кэш не уменьшится до 90% лимита """
+        target = self.max_bytes * 0.9
+        evicted = 0
+        rows = conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall()
+        for url, size in rows:
+            if self._total_bytes <= target:
+                break
+            conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self._total_bytes -= size
+            evicted += 1
+        logger.debug("Evicted %s responses from HTTP cache", evicted)
+
+    async def get(self, url: str) -> Optional[CachedResponse]:
+        try:
+            return await asyncio.to_thread(self._get, url)
+        except (sqlite3.Error, zlib.error) as e:
+            logger.warning("HTTP cache read failed for %s: %s", url, e)
+            return None
+
+    async def put(self, entry: CachedResponse) -> None:
+        try:
+            await asyncio.to_thread(self._put, entry)
+        except sqlite3.Error as e:
+            logger.warning("HTTP cache write failed for %s: %s", entry.url, e)
+
+    async def touch(self, url: str) -> None:
+        """ Продлевает свежесть записи после ответа 304 """
+        try:
+            await asyncio.to_thread(self._touch, url)
+        except sqlite3.Error as e:
+            logger.warning("HTTP cache update failed for %s: %s", url, e)
+
+    def dispose(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,115 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Deque, Dict
+
+
+class _Permit:
+    """ Разрешение на один запрос; вызывающий код отмечает перегрузку """
+
+    def __init__(self) -> None:
+        self.started_at = time.monotonic()
+        self.congested = False
+
+
+class AIMDConcurrencyLimiter:
+    """
+    Ограничивает число одновременных запросов и подстраивает лимит по AIMD.
+
+    Пока ответы быстрые и без 429/5xx, а лимит занят целиком, он растёт на
+    ``increase`` за «окно» запросов - недогруженный лимит не растёт; при
+    перегрузке или задержке выше ``latency_threshold`` лимит умножается на
+    ``decrease``. Сигналы от запросов, начатых до
+    последнего снижения, игнорируются - одна волна 429 снижает лимит один раз.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_threshold: float = 2.0,
+        adaptive: bool = True,
+        history_size: int = 100,
+    ) -> None:
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_threshold = latency_threshold
+        self.adaptive = adaptive
+        self.in_flight = 0
+        self.successes = 0
+        self.congestion_events = 0
+        self.history: Deque[Dict] = deque(maxlen=history_size)
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[_Permit]:
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+        permit = _Permit()
+        try:
+            yield permit
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._on_complete(permit)
+                self._condition.notify_all()
+
+    def _on_complete(self, permit: _Permit) -> None:
+        latency = time.monotonic() - permit.started_at
+        if permit.congested or latency > self.latency_threshold:
+            self.congestion_events += 1
+            reason = "congestion" if permit.congested else "latency %.2fs" % latency
+            self._decrease(permit, reason)
+        else:
+            self.successes += 1
+            # in_flight уже без завершившегося запроса
+            if self.in_flight >= int(self.limit) - 1:
+                self._increase()
+
+    def _increase(self) -> None:
+        if not self.adaptive or self.limit >= self.max_limit:
+            return
+        previous = int(self.limit)
+        self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+        if int(self.limit) != previous:
+            self._record(previous, "increase")
+
+    def _decrease(self, permit: _Permit, reason: str) -> None:
+        if not self.adaptive or permit.started_at < self._last_decrease:
+            return
+        self._last_decrease = time.monotonic()
+        previous = int(self.limit)
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self._record(previous, reason)
+
+    def _record(self, previous: int, reason: str) -> None:
+        self.history.append(
+            {
+                "at": datetime.utcnow(),
+                "previous_limit": previous,
+                "limit": int(self.limit),
+                "reason": reason,
+            }
+        )
+
+    def stats(self) -> Dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "min_limit": self.min_limit,
+            "max_limit": self.max_limit,
+            "successes": self.successes,
+            "congestion_events": self.congestion_events,
+            "history": list(self.history),
+        }
@@ -0,0 +1,56 @@
+import asyncio
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Literal, Optional, TypeVar
+
+from core.config import settings
+
+logger = logging.getLogger(settings.logger.logger_name)
+
+R = TypeVar("R")
+
+
+class ExtractionExecutor:
+    """
+    Выполняет CPU-нагруженный разбор HTML вне event loop.
+
+    ``process`` - пул процессов, ``thread`` - пул потоков,
+    ``inline`` - прямо в event loop (для отладки).
+    """
+
+    def __init__(
+        self,
+        kind: Literal["process", "thread", "inline"] = "process",
+        max_workers: Optional[int] = None,
+    ) -> None:
+        self.kind = kind
+        self.max_workers = max_workers
+        self._executor: Optional[Executor] = None
+
+    def start(self) -> None:
+        if self.kind == "inline" or self._executor is not None:
+            return
+        logger.debug("Starting %s extraction pool, workers: %s", self.kind, self.max_workers)
+        if self.kind == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="extractor")
+
+    async def run(self, func: Callable[..., R], *args) -> R:
+        if self.kind == "inline":
+            return func(*args)
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args))
+
+    def dispose(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+extraction_executor = ExtractionExecutor(
+    kind=settings.parser.executor,
+    max_workers=settings.parser.executor_workers,
+)
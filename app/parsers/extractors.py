@@ -0,0 +1,64 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from parsers.urls import canonicalize_url, title_from_url
+
+
+@dataclass
+class PageData:
+    """ Результат разбора страницы, пригодный для передачи между процессами """
+
+    title: str
+    content: str
+    links: List[str] = field(default_factory=list)
+    fetched_at: Optional[datetime] = None
+    # <link rel="canonical"> страницы; для перенаправлений отличается от запрошенного URL
+    canonical_url: Optional[str] = None
+    # Цель перенаправления, если вместо статьи пришла страница перенаправления (action=render)
+    redirect_url: Optional[str] = None
+
+
+def is_article_href(href: str) -> bool:
+    return href.startswith("/wiki/") and not any(x in href for x in [":", "#"])
+
+
+def extract_page(html: str, url: str, base_url: str) -> PageData:
+    """ Извлекает заголовок, текст и ссылки на другие статьи со страницы """
+    soup = BeautifulSoup(html, "lxml")
+
+    # Извлекаем заголовок
+    title_tag = soup.find("h1", id="firstHeading")
+    title = title_tag.text.strip() if title_tag else title_from_url(url) or url
+
+    canonical_tag = soup.find("link", rel="canonical", href=True)
+    canonical_url = canonicalize_url(urljoin(base_url, canonical_tag["href"])) if canonical_tag else None
+
+    redirect_tag = soup.select_one("ul.redirectText a[href]")
+    redirect_url = canonicalize_url(urljoin(base_url, redirect_tag["href"])) if redirect_tag else None
+
+    # Извлекаем контент
+    # Вариант action=render состоит только из mw-parser-output
+    content_div = soup.find("div", {"id": "mw-content-text"}) or soup.find("div", class_="mw-parser-output")
+    content = ""
+    links = []
+    if content_div:
+        paragraphs = content_div.find_all("p")
+        content = "\n".join(p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True))
+
+        # Ищем ссылки на другие статьи
+        for link in content_div.find_all("a", href=True):
+            href = link.get("href", "")
+            if isinstance(href, str) and is_article_href(href):
+                links.append(canonicalize_url(urljoin(base_url, href)))
+
+    return PageData(
+        title=title,
+        content=content,
+        links=list(dict.fromkeys(links)),
+        canonical_url=canonical_url,
+        redirect_url=redirect_url,
+    )
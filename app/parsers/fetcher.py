@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+from core.config import BASE_DIR, settings
+from parsers.cache import CachedResponse, DiskResponseCache
+from parsers.concurrency import AIMDConcurrencyLimiter
+from parsers.rate_limiter import HostRateLimiter
+
+logger = logging.getLogger(settings.logger.logger_name)
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Заголовки, которые теряют смысл после распаковки тела
+_ENCODING_HEADERS = {"content-encoding", "content-length"}
+
+
+class PageTooLargeError(Exception):
+    """ Тело ответа больше допустимого размера, загрузка прервана """
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """ Разбирает заголовок Retry-After (секунды или HTTP-дата) """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class PageFetcher:
+    """
+    Загружает страницы с ограничением частоты запросов к хосту и повторами.
+
+    Повторяет запрос при 429/5xx и сетевых ошибках с экспоненциальной
+    задержкой и jitter; если сервер прислал Retry-After, ждёт не меньше него,
+    а если больше ``max_retry_after`` - не повторяет и отдаёт ошибку ответа.
+    Каждая попытка занимает слот в ``concurrency_limiter`` и сообщает ему о
+    перегрузке; на время паузы перед повтором слот освобождается. Если задан ``cache``, свежие ответы отдаются с диска, а
+    устаревшие перепроверяются условным запросом.
+
+    Тело ответа читается потоком: если оно больше ``max_bytes`` после
+    распаковки, загрузка прерывается с ``PageTooLargeError``. Такой ответ не
+    повторяется, а краулер пропускает страницу, как любую другую ошибку загрузки.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        rate_limiter: HostRateLimiter,
+        concurrency_limiter: AIMDConcurrencyLimiter,
+        cache: Optional[DiskResponseCache] = None,
+        timeout: float = settings.parser.timeout,
+        max_retries: int = settings.parser.max_retries,
+        backoff_base: float = settings.parser.backoff_base,
+        backoff_max: float = settings.parser.backoff_max,
+        max_retry_after: float = settings.parser.max_retry_after,
+        max_bytes: Optional[int] = settings.parser.max_page_bytes,
+    ) -> None:
+        self.client = client
+        self.rate_limiter = rate_limiter
+        self.concurrency_limiter = concurrency_limiter
+        self.cache = cache
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.max_bytes = max_bytes
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    async def get(self, url: str) -> httpx.Response:
+        if self.cache is None:
+            return await self._request(url)
+
+        cached = await self.cache.get(url)
+        if cached is not None and cached.is_fresh(self.cache.ttl):
+            logger.debug("HTTP cache hit: %s", url)
+            return self._from_cache(cached)
+
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        resp = await self._request(url, headers)
+        if resp.status_code == httpx.codes.NOT_MODIFIED and cached is not None:
+            logger.debug("HTTP cache revalidated: %s", url)
+            await self.cache.touch(url)
+            return self._from_cache(cached)
+
+        await self.cache.put(
+            CachedResponse(
+                url=url,
+                body=resp.content,
+                content_type=resp.headers.get("Content-Type"),
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+                fetched_at=time.time(),
+            )
+        )
+        return resp
+
+    @staticmethod
+    def _from_cache(cached: CachedResponse) -> httpx.Response:
+        headers = {"Content-Type": cached.content_type} if cached.content_type else {}
+        return httpx.Response(
+            httpx.codes.OK,
+            content=cached.body,
+            headers=headers,
+            request=httpx.Request("GET", cached.url),
+        )
+
+    async def _get(self, url: str, headers: Optional[Dict[str, str]]) -> httpx.Response:
+        """ Загружает ответ, читая тело потоком не больше ``max_bytes`` """
+        async with self.client.stream(
+            "GET", url, headers=headers, timeout=self.timeout, follow_redirects=True
+        ) as resp:
+            if self.max_bytes is None:
+                await resp.aread()
+                return resp
+
+            # Сжатое тело не больше распакованного, так что можно не начинать загрузку
+            content_length = resp.headers.get("Content-Length", "")
+            if content_length.isdigit() and int(content_length) > self.max_bytes:
+                raise PageTooLargeError(f"{url}: Content-Length {content_length} exceeds {self.max_bytes} bytes")
+
+            body = bytearray()
+            async for chunk in resp.aiter_bytes():
+                body += chunk
+                if len(body) > self.max_bytes:
+                    raise PageTooLargeError(f"{url}: body exceeds {self.max_bytes} bytes")
+
+        headers = [(key, value) for key, value in resp.headers.multi_items() if key.lower() not in _ENCODING_HEADERS]
+        return httpx.Response(resp.status_code, headers=headers, content=bytes(body), request=resp.request)
+
+    async def _attempt(self, url: str, headers: Optional[Dict[str, str]]) -> httpx.Response:
+        """ Одна попытка запроса, занимает слот только на время самого запроса """
+        async with self.concurrency_limiter.acquire() as permit:
+            try:
+                resp = await self._get(url, headers)
+            except httpx.TimeoutException:
+                permit.congested = True
+                raise
+            permit.congested = resp.status_code in RETRY_STATUS_CODES
+        return resp
+
+    async def _request(self, url: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        host = httpx.URL(url).host
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire(host)
+            try:
+                resp = await self._attempt(url, headers)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning("Request to %s failed (%s), retry in %.2fs", url, e, delay)
+            else:
+                if resp.status_code == httpx.codes.NOT_MODIFIED and headers:
+                    return resp
+                if resp.status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+                    resp.raise_for_status()
+                    return resp
+                delay = self._backoff(attempt)
+                retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                if retry_after is not None:
+                    if retry_after > self.max_retry_after:
+                        logger.warning(
+                            "Got %s from %s with Retry-After %.0fs, giving up", resp.status_code, url, retry_after
+                        )
+                        resp.raise_for_status()
+                    delay = max(delay, retry_after)
+                    self.rate_limiter.pause(host, delay)
+                logger.warning("Got %s from %s, retry in %.2fs", resp.status_code, url, delay)
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+
+host_rate_limiter = HostRateLimiter(
+    rate=settings.parser.rate_limit,
+    capacity=settings.parser.rate_burst,
+)
+
+crawl_concurrency = AIMDConcurrencyLimiter(
+    initial=settings.parser.concurrency,
+    min_limit=settings.parser.min_concurrency,
+    max_limit=settings.parser.max_concurrency,
+    latency_threshold=settings.parser.latency_threshold,
+    adaptive=settings.parser.adaptive_concurrency,
+)
+
+response_cache = (
+    DiskResponseCache(
+        path=BASE_DIR / settings.parser.cache_path,
+        ttl=settings.parser.cache_ttl,
+        max_bytes=settings.parser.cache_max_bytes,
+    )
+    if settings.parser.cache_enabled
+    else None
+)
@@ -0,0 +1,60 @@
+from urllib.parse import urljoin
+
+import lxml.html
+from lxml import etree
+
+from parsers.extractors import PageData, is_article_href
+from parsers.urls import canonicalize_url, title_from_url
+
+
+def extract_page_lxml(html: str, url: str, base_url: str) -> PageData:
+    """
+    Извлекает заголовок, текст и ссылки на другие статьи со страницы.
+
+    Аналог ``extract_page`` без построения дерева BeautifulSoup: абзацы и
+    ссылки собираются за один проход по ``mw-content-text``.
+    """
+    root = lxml.html.document_fromstring(html)
+
+    # Извлекаем заголовок
+    title_tags = root.xpath('//h1[@id="firstHeading"]')
+    title = title_tags[0].text_content().strip() if title_tags else title_from_url(url) or url
+
+    canonical_hrefs = root.xpath('//link[@rel="canonical"]/@href')
+    canonical_url = canonicalize_url(urljoin(base_url, canonical_hrefs[0])) if canonical_hrefs else None
+
+    redirect_hrefs = root.xpath('//ul[contains(concat(" ", normalize-space(@class), " "), " redirectText ")]//a/@href')
+    redirect_url = canonicalize_url(urljoin(base_url, redirect_hrefs[0])) if redirect_hrefs else None
+
+    # Вариант action=render состоит только из mw-parser-output
+    content_divs = root.xpath('//div[@id="mw-content-text"]') or root.xpath(
+        '//div[contains(concat(" ", normalize-space(@class), " "), " mw-parser-output ")]'
+    )
+    if not content_divs:
+        return PageData(title=title, content="", canonical_url=canonical_url, redirect_url=redirect_url)
+    content_div = content_divs[0]
+
+    # Как и BeautifulSoup.get_text, не учитываем содержимое скриптов и стилей
+    etree.strip_elements(content_div, "script", "style", with_tail=False)
+
+    # Абзацы и ссылки за один проход по контенту
+    paragraphs = []
+    links = {}
+    for element in content_div.iter("p", "a"):
+        if element.tag == "p":
+            text = "".join(part.strip() for part in element.itertext())
+            if text:
+                paragraphs.append(text)
+            continue
+
+        href = element.get("href")
+        if href is not None and is_article_href(href):
+            links.setdefault(canonicalize_url(urljoin(base_url, href)), None)
+
+    return PageData(
+        title=title,
+        content="\n".join(paragraphs),
+        links=list(links),
+        canonical_url=canonical_url,
+        redirect_url=redirect_url,
+    )
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from core.config import settings
+from parsers.extractors import PageData
+from parsers.fetcher import PageFetcher
+from parsers.urls import title_from_url, url_from_title
+
+logger = logging.getLogger(settings.logger.logger_name)
+
+# Общие параметры запросов к API
+_BASE_PARAMS = {
+    "action": "query",
+    "format": "json",
+    "formatversion": "2",
+    "redirects": "1",
+}
+
+# Параметры выдачи текста статьи
+_EXTRACT_PARAMS = {
+    "explaintext": "1",
+    "exsectionformat": "plain",
+    "exlimit": "max",
+}
+
+# Только ссылки на статьи основного пространства имён
+_LINK_PARAMS = {
+    "plnamespace": "0",
+    "pllimit": "max",
+}
+
+
+class MediaWikiApiError(Exception):
+    """ API вернуло ошибку вместо результата """
+
+
+@dataclass
+class _QueryResult:
+    """ Результат запроса к API, собранный со всех страниц продолжения """
+
+    pages: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    # Исходное название -> итоговое (после нормализации и перенаправлений)
+    titles: Dict[str, str] = field(default_factory=dict)
+
+    def resolve(self, title: str) -> str:
+        seen = set()
+        while title in self.titles and title not in seen:
+            seen.add(title)
+            title = self.titles[title]
+        return title
+
+
+class MediaWikiApiSource:
+    """
+    Загружает статьи через MediaWiki Action API вместо HTML страниц.
+
+    Название, текст (``prop=extracts``) и ссылки (``prop=links``) до
+    ``batch_size`` статей приходят одним запросом с продолжениями, перенаправления
+    разрешает само API. Целиком текст API отдаёт только по одной статье за запрос,
+    поэтому без ``intro_only`` тексты запрашиваются отдельно, параллельно.
+    Ссылки API отдаёт по алфавиту, а не в порядке появления в тексте.
+    Число одновременных запросов ограничивает ``concurrency_limiter`` у ``fetcher``.
+    """
+
+    def __init__(
+        self,
+        fetcher: PageFetcher,
+        api_url: Optional[str] = settings.parser.api_url,
+        batch_size: int = settings.parser.api_batch_size,
+        intro_only: bool = settings.parser.api_intro_only,
+    ) -> None:
+        self.fetcher = fetcher
+        self.api_url = api_url
+        self.batch_size = batch_size
+        self.intro_only = intro_only
+
+    async def fetch_pages(self, urls: Sequence[str]) -> Dict[str, PageData]:
+        """
+        Загружает статьи по каноническим URL.
+        Возвращает данные по исходным URL; статьи, которые получить не удалось, пропускаются.
+        Статьи пакета, запрос которого завершился ошибкой, запрашиваются по одной:
+        ошибка из-за одной статьи не теряет весь пакет
+        """
+        batches: Dict[str, List[str]] = {}
+        for url in dict.fromkeys(urls):
+            if title_from_url(url) is None:
+                logger.warning("Not an article URL, skipping: %s", url)
+                continue
+            parts = urlsplit(url)
+            batches.setdefault(f"{parts.scheme}://{parts.netloc}", []).append(url)
+
+        chunks = [
+            (site, site_urls[i : i + self.batch_size])
+            for site, site_urls in batches.items()
+            for i in range(0, len(site_urls), self.batch_size)
+        ]
+        pages = {}
+        retry = []
+        for (site, chunk), result in zip(chunks, await self._fetch_chunks(chunks)):
+            if not isinstance(result, BaseException):
+                pages.update(result)
+            elif len(chunk) > 1:
+                logger.warning(
+                    "MediaWiki API batch of %s articles from %s failed (%s), requesting them one by one",
+                    len(chunk), site, result,
+                )
+                retry.extend((site, [url]) for url in chunk)
+            else:
+                logger.error("Failed to get %s via MediaWiki API: %s", chunk[0], result)
+
+        for (site, chunk), result in zip(retry, await self._fetch_chunks(retry)):
+            if isinstance(result, BaseException):
+                logger.error("Failed to get %s via MediaWiki API: %s", chunk[0], result)
+                continue
+            pages.update(result)
+        return pages
+
+    async def _fetch_chunks(self, chunks: List[Tuple[str, List[str]]]) -> List[Any]:
+        """ Загружает пакеты параллельно; вместо результата упавшего пакета - исключение """
+        return await asyncio.gather(
+            *(self._fetch_batch(site, chunk) for site, chunk in chunks), return_exceptions=True
+        )
+
+    async def _fetch_batch(self, site: str, urls: List[str]) -> Dict[str, PageData]:
+        endpoint = self.api_url or f"{site}/w/api.php"
+        titles = {url: title_from_url(url) for url in urls}
+
+        params = {**_BASE_PARAMS, **_LINK_PARAMS, "titles": "|".join(titles.values())}
+        if self.intro_only:
+            params.update(_EXTRACT_PARAMS, prop="links|extracts", exintro="1")
+        else:
+            params["prop"] = "links"
+        result = await self._query(endpoint, params)
+
+        if not self.intro_only:
+            found = [page["title"] for page in result.pages.values() if not page.get("missing")]
+            extracts = await asyncio.gather(*(self._fetch_extract(endpoint, title) for title in found))
+            for title, extract in zip(found, extracts):
+                result.pages[title]["extract"] = extract
+
+        fetched_at = datetime.utcnow()
+        pages = {}
+        for url, title in titles.items():
+            page = result.pages.get(result.resolve(title))
+            if page is None or page.get("missing") or page.get("invalid") or page.get("extract") is None:
+                logger.debug("Article not found via MediaWiki API: %s", url)
+                continue
+            pages[url] = PageData(
+                title=page["title"],
+                content="\n".join(line.strip() for line in page["extract"].splitlines() if line.strip()),
+                links=list(dict.fromkeys(url_from_title(site, link["title"]) for link in page["links"])),
+                fetched_at=fetched_at,
+                canonical_url=url_from_title(site, page["title"]),
+            )
+        return pages
+
+    async def _fetch_extract(self, endpoint: str, title: str) -> Optional[str]:
+        params = {**_BASE_PARAMS, **_EXTRACT_PARAMS, "prop": "extracts", "titles": title}
+        try:
+            result = await self._query(endpoint, params)
+        except Exception as e:
+            logger.error("Failed to get extract of %r via MediaWiki API: %s", title, e)
+            return None
+        page = result.pages.get(result.resolve(title))
+        return page.get("extract") if page else None
+
+    async def _query(self, endpoint: str, params: Dict[str, str]) -> _QueryResult:
+        """ Выполняет запрос, проходя по всем продолжениям (``continue``) """
+        result = _QueryResult()
+        cont: Dict[str, str] = {}
+        while True:
+            resp = await self.fetcher.get(str(httpx.URL(endpoint, params={**params, **cont})))
+            data = resp.json()
+            if "error" in data:
+                raise MediaWikiApiError(f"{data['error'].get('code')}: {data['error'].get('info')}")
+
+            query = data.get("query", {})
+            for item in query.get("normalized", []) + query.get("redirects", []):
+                result.titles[item["from"]] = item["to"]
+            for page in query.get("pages", []):
+                merged = result.pages.setdefault(page["title"], {**page, "links": []})
+                merged["links"].extend(page.get("links", []))
+                if "extract" in page:
+                    merged["extract"] = page["extract"]
+
+            if "continue" not in data:
+                return result
+            cont = data["continue"]
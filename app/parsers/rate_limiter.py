@@ -0,0 +1,61 @@
+import asyncio
+import time
+from typing import Dict
+
+
+class TokenBucket:
+    """ Token bucket: не более ``rate`` запросов в секунду с пиком до ``capacity`` """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def pause(self, delay: float) -> None:
+        """ Запрещает запросы на ``delay`` секунд (например, по Retry-After) """
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                await asyncio.sleep(wait)
+
+
+class HostRateLimiter:
+    """ Отдельный token bucket на каждый хост """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def _bucket(self, host: str) -> TokenBucket:
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = self._buckets[host] = TokenBucket(self.rate, self.capacity)
+        return bucket
+
+    async def acquire(self, host: str) -> None:
+        if self.rate <= 0:
+            return
+        await self._bucket(host).acquire()
+
+    def pause(self, host: str, delay: float) -> None:
+        if self.rate <= 0:
+            return
+        self._bucket(host).pause(delay)
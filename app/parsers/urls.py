@@ -0,0 +1,91 @@
+from typing import Optional
+from urllib.parse import parse_qs, quote, unquote, urlencode, urljoin, urlsplit, urlunsplit
+
+# Символы пути, которые не нужно кодировать
+_PATH_SAFE = "/:@!$&'()*+,;=-._~"
+
+_WIKI_PREFIX = "/wiki/"
+
+
+def normalize_url(url: str) -> str:
+    """
+    Приводит URL статьи к единому виду: схема и хост в нижнем регистре,
+    путь в одном варианте процентного кодирования, без фрагмента.
+    """
+    parts = urlsplit(url.strip())
+    path = quote(unquote(parts.path), safe=_PATH_SAFE)
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+def _is_wikipedia_host(host: str) -> bool:
+    return host == "wikipedia.org" or host.endswith(".wikipedia.org")
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Канонический URL статьи Wikipedia, под которым она хранится и обходится.
+
+    Помимо ``normalize_url``: мобильный хост заменяется основным, схема - https,
+    ``/w/index.php?title=X`` - ``/wiki/X``, пробелы в названии - ``_``, первая
+    буква названия - заглавная (так MediaWiki сопоставляет названия),
+    параметры запроса у ``/wiki/`` отбрасываются.
+    URL не с Wikipedia только нормализуются.
+    """
+    url = normalize_url(url)
+    parts = urlsplit(url)
+    host = parts.netloc
+    if not _is_wikipedia_host(host):
+        return url
+
+    labels = host.split(".")
+    if len(labels) > 3 and labels[1] == "m":
+        host = ".".join(labels[:1] + labels[2:])
+
+    path = unquote(parts.path)
+    if path == "/w/index.php":
+        titles = parse_qs(parts.query).get("title")
+        if not titles:
+            return urlunsplit(("https", host, parts.path, parts.query, ""))
+        path = _WIKI_PREFIX + titles[0]
+
+    if not path.startswith(_WIKI_PREFIX):
+        return urlunsplit(("https", host, parts.path, parts.query, ""))
+
+    title = path[len(_WIKI_PREFIX):].replace(" ", "_").strip("_")
+    title = title[:1].upper() + title[1:]
+    return urlunsplit(("https", host, quote(_WIKI_PREFIX + title, safe=_PATH_SAFE), "", ""))
+
+
+def title_from_url(url: str) -> Optional[str]:
+    """ Название статьи из её канонического URL, ``None`` для URL не вида ``/wiki/...`` """
+    path = unquote(urlsplit(url).path)
+    if not path.startswith(_WIKI_PREFIX):
+        return None
+    return path[len(_WIKI_PREFIX):].replace("_", " ")
+
+
+def url_from_title(base_url: str, title: str) -> str:
+    """ Канонический URL статьи по её названию """
+    path = quote(_WIKI_PREFIX + title.replace(" ", "_"), safe=_PATH_SAFE)
+    return canonicalize_url(urljoin(base_url, path))
+
+
+def variant_url(url: str, variant: str) -> str:
+    """
+    URL варианта страницы статьи по её каноническому URL:
+    ``render`` - только HTML содержимого (``action=render``), ``mobile`` - мобильная версия.
+    Для ``full`` и URL не статей Wikipedia возвращает исходный URL.
+    """
+    parts = urlsplit(url)
+    title = title_from_url(url)
+    if variant == "full" or title is None or not _is_wikipedia_host(parts.netloc):
+        return url
+
+    if variant == "render":
+        query = urlencode({"title": title.replace(" ", "_"), "action": "render"})
+        return urlunsplit((parts.scheme, parts.netloc, "/w/index.php", query, ""))
+
+    labels = parts.netloc.split(".")
+    if len(labels) != 3:
+        return url
+    return urlunsplit((parts.scheme, ".".join([labels[0], "m", *labels[1:]]), parts.path, "", ""))
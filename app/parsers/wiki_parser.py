@@ -1,15 +1,353 @@
+import asyncio
 import logging
-from typing import Optional, Set
-from urllib.parse import urljoin
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Literal, Optional, Sequence, Set, Tuple
 
 import httpx
-from bs4 import BeautifulSoup
 
-from articles.schemas import WikiArticleSchema
+from articles.schemas import CrawledArticleSchema, WikiArticleSchema
 from core.config import settings
+from parsers.executor import extraction_executor
+from parsers.extractors import PageData, extract_page
+from parsers.fetcher import PageFetcher, PageTooLargeError, crawl_concurrency, host_rate_limiter, response_cache
+from parsers.lxml_extractor import extract_page_lxml
+from parsers.mediawiki_api import MediaWikiApiSource
+from parsers.urls import canonicalize_url, variant_url
 
 logger = logging.getLogger(settings.logger.logger_name)
 
+EXTRACTORS = {
+    "bs4": extract_page,
+    "lxml": extract_page_lxml,
+}
+
+# Возвращает уже сохранённые страницы для переданных URL
+StoreLookup = Callable[[List[str]], Awaitable[Dict[str, PageData]]]
+
+# Вызывается для каждой полученной статьи: (url, уровень; у исходной статьи - 1)
+PageCallback = Callable[[str, int], None]
+
+
+@dataclass
+class _CrawlNode:
+    """ Узел дерева обхода """
+
+    url: str
+    depth: int
+    parent_url: Optional[str] = None
+    title: str = ""
+    content: str = ""
+    links: List[str] = field(default_factory=list)
+    fetched_at: Optional[datetime] = None
+    children: List[Tuple[int, "_CrawlNode"]] = field(default_factory=list)
+    cursor: int = 0
+
+    def apply(self, page: PageData) -> None:
+        self.title, self.content, self.links = page.title, page.content, page.links
+        self.fetched_at = page.fetched_at or datetime.utcnow()
+
+    def to_page(self, level: int) -> CrawledArticleSchema:
+        return CrawledArticleSchema(
+            title=self.title,
+            url=self.url,
+            content=self.content,
+            links=self.links,
+            fetched_at=self.fetched_at,
+            depth=level,
+            parent_url=self.parent_url,
+        )
+
+    def to_schema(self) -> WikiArticleSchema:
+        children = [child.to_schema() for _, child in sorted(self.children, key=lambda item: item[0])]
+        return WikiArticleSchema(
+            title=self.title,
+            url=self.url,
+            content=self.content,
+            links=self.links,
+            fetched_at=self.fetched_at,
+            children=children,
+        )
+
+
+class WikiCrawler:
+    """
+    Обходит дерево статей Wikipedia по уровням.
+
+    Все страницы одного уровня загружаются параллельно, число одновременных
+    запросов всех обходов ограничивает общий AIMD-лимит ``crawl_concurrency``. Дочерние ссылки закрепляются в ``visited``
+    в порядке обхода, поэтому каждая статья попадает в дерево только один раз.
+
+    Если передан ``store_lookup``, перед загрузкой уровня одним запросом
+    выясняется, какие страницы уже сохранены, и они берутся из хранилища.
+    ``on_page`` позволяет следить за ходом обхода.
+
+    URL приводятся к канонической форме. Если страница оказалась перенаправлением
+    (её канонический URL отличается от запрошенного), узел переходит на
+    канонический URL, а пара попадает в ``aliases``; статья, уже встреченная
+    в обходе под каноническим URL, повторно не добавляется.
+
+    С ``backend="api"`` страницы уровня загружаются пакетами через
+    MediaWiki Action API (``MediaWikiApiSource``) вместо HTML. Для HTML
+    ``page_variant`` позволяет загружать облегчённый вариант страницы.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        visited: Set[str],
+        base_url: str = settings.parser.wiki_base,
+        timeout: int = settings.parser.timeout,
+        max_children: int = settings.parser.max_children,
+        extractor: str = settings.parser.extractor,
+        backend: Literal["html", "api"] = settings.parser.backend,
+        page_variant: Literal["full", "render", "mobile"] = settings.parser.page_variant,
+        store_lookup: Optional[StoreLookup] = None,
+        on_page: Optional[PageCallback] = None,
+        aliases: Optional[Dict[str, str]] = None,
+    ):
+        self.fetcher = PageFetcher(
+            client=client,
+            rate_limiter=host_rate_limiter,
+            concurrency_limiter=crawl_concurrency,
+            cache=response_cache,
+            timeout=timeout,
+        )
+        self.api = None
+        if backend == "api":
+            api_fetcher = PageFetcher(
+                client=client,
+                rate_limiter=host_rate_limiter,
+                concurrency_limiter=crawl_concurrency,
+                timeout=timeout,
+            )
+            self.api = MediaWikiApiSource(fetcher=api_fetcher)
+        self.page_variant = page_variant
+        self.visited = visited
+        self.base_url = base_url
+        self.max_children = max_children
+        self.extract = EXTRACTORS[extractor]
+        self.store_lookup = store_lookup
+        self.on_page = on_page
+        self.aliases = aliases if aliases is not None else {}
+        self._depth = 0
+
+    async def crawl(self, url: str, depth: int) -> Optional[WikiArticleSchema]:
+        """ Обходит статьи и возвращает их дерево целиком """
+        return (await self.crawl_many([url], depth)).get(url)
+
+    async def crawl_many(self, urls: Sequence[str], depth: int) -> Dict[str, Optional[WikiArticleSchema]]:
+        """
+        Обходит статьи от нескольких исходных URL за один обход с общим ``visited``.
+        Возвращает дерево для каждого исходного URL (``None``, если статью получить не удалось).
+        """
+        roots = {}
+        async for level in self._iter_levels(urls, depth):
+            if not roots:
+                roots = {node.url: node for node in level}
+        results = {}
+        for url in urls:
+            root = roots.get(self.resolve(url))
+            results[url] = root.to_schema() if root else None
+        return results
+
+    def resolve(self, url: str) -> str:
+        """ Канонический URL статьи с учётом найденных при обходе перенаправлений """
+        url = canonicalize_url(url)
+        return self.aliases.get(url, url)
+
+    async def iter_crawl(self, url: str, depth: int) -> AsyncIterator[List[CrawledArticleSchema]]:
+        """
+        Обходит статьи, отдавая их по уровням по мере загрузки.
+        Дерево целиком не хранится: уже отданные уровни освобождаются.
+        """
+        async for level in self._iter_levels([url], depth):
+            yield [node.to_page(self._depth - node.depth + 1) for node in level]
+            for node in level:
+                node.content = ""
+
+    async def _iter_levels(self, urls: Sequence[str], depth: int) -> AsyncIterator[List[_CrawlNode]]:
+        if depth <= 0:
+            logger.debug("Maximum depth reached for %r", urls)
+            return
+
+        seeds = []
+        for url in dict.fromkeys(canonicalize_url(url) for url in urls):
+            if url in self.visited:
+                logger.debug("Article already visited: %s", url)
+                continue
+            self.visited.add(url)
+            seeds.append(_CrawlNode(url=url, depth=depth))
+
+        self._depth = depth
+        # Ссылки на корни не держим, чтобы отданные уровни могли освобождаться
+        results = await self._load(seeds)
+        level = [node for node, ok in zip(seeds, results) if ok]
+
+        while level:
+            yield level
+            level = await self._expand_level(level)
+
+    async def _expand_level(self, parents: List[_CrawlNode]) -> List[_CrawlNode]:
+        """ Загружает дочерние статьи для всех узлов уровня и возвращает следующий уровень """
+        next_level = []
+        pending = [parent for parent in parents if parent.depth > 1]
+
+        while pending:
+            wave = []
+            for parent in pending:
+                wanted = self.max_children - len(parent.children)
+                while wanted > 0 and parent.cursor < len(parent.links):
+                    position = parent.cursor
+                    child_url = canonicalize_url(parent.links[position])
+                    parent.cursor += 1
+                    if child_url in self.visited:
+                        continue
+                    self.visited.add(child_url)
+                    child = _CrawlNode(url=child_url, depth=parent.depth - 1, parent_url=parent.url)
+                    wave.append((parent, position, child))
+                    wanted -= 1
+
+            if not wave:
+                break
+
+            results = await self._load([child for _, _, child in wave])
+            for (parent, position, child), ok in zip(wave, results):
+                if ok:
+                    parent.children.append((position, child))
+                    next_level.append(child)
+                    logger.debug("Added child article: %s", child.title)
+
+            # Если часть загрузок не удалась, добираем детей из оставшихся ссылок
+            pending = [
+                parent
+                for parent in pending
+                if len(parent.children) < self.max_children and parent.cursor < len(parent.links)
+            ]
+
+        for parent in parents:
+            logger.info(
+                "Successfully parsed article: %s with %s child articles",
+                parent.title,
+                len(parent.children),
+            )
+        return next_level
+
+    async def _load(self, nodes: List[_CrawlNode]) -> List[bool]:
+        """ Заполняет узлы из хранилища или загружает их страницы """
+        stored = {}
+        if self.store_lookup is not None:
+            try:
+                stored = await self.store_lookup([node.url for node in nodes])
+            except Exception as e:
+                logger.error("Stored articles lookup failed: %s", e, exc_info=True)
+            logger.debug("Reusing %s of %s articles from storage", len(stored), len(nodes))
+
+        for node in nodes:
+            if node.url in stored:
+                node.apply(stored[node.url])
+
+        missing = [node for node in nodes if node.url not in stored]
+        if self.api is not None:
+            fetched = iter(await self._fetch_batch(missing))
+        else:
+            fetched = iter(await asyncio.gather(*(self._fetch(node) for node in missing)))
+        results = [
+            self._settle(node, stored[node.url].canonical_url) if node.url in stored else next(fetched)
+            for node in nodes
+        ]
+
+        if self.on_page is not None:
+            for node, ok in zip(nodes, results):
+                if ok:
+                    self.on_page(node.url, self._depth - node.depth + 1)
+        return results
+
+    async def _fetch(self, node: _CrawlNode) -> bool:
+        """
+        Загружает и разбирает страницу узла.
+        Страница, которую не удалось загрузить (в том числе слишком большая), пропускается
+        """
+        try:
+            page, final_url = await self._fetch_page(node.url)
+            if page.redirect_url is not None:
+                # action=render не следует перенаправлениям: переходим к целевой статье
+                if not self._settle(node, page.redirect_url):
+                    return False
+                page, final_url = await self._fetch_page(node.url)
+                if page.redirect_url is not None:
+                    raise ValueError(f"double redirect to {page.redirect_url}")
+            node.apply(page)
+            logger.debug("Extracted title: %s, found %s links", node.title, len(node.links))
+            return self._settle(node, page.canonical_url or final_url)
+        except PageTooLargeError as e:
+            logger.warning("Skipping %s: %s", node.url, e)
+            return False
+        except Exception as e:
+            logger.error("Error parsing %s: %s", node.url, e, exc_info=True)
+            return False
+
+    async def _fetch_page(self, url: str) -> Tuple[PageData, str]:
+        """ Загружает страницу статьи, возвращает её данные и канонический URL ответа """
+        logger.debug("Request to %r", url)
+        resp = await self.fetcher.get(variant_url(url, self.page_variant))
+        page = await extraction_executor.run(self.extract, resp.text, url, self.base_url)
+        return page, canonicalize_url(str(resp.url))
+
+    async def _fetch_batch(self, nodes: List[_CrawlNode]) -> List[bool]:
+        """ Загружает страницы узлов пакетами через MediaWiki API """
+        if not nodes:
+            return []
+        pages = await self.api.fetch_pages([node.url for node in nodes])
+        logger.debug("Got %s of %s articles via MediaWiki API", len(pages), len(nodes))
+
+        results = []
+        for node in nodes:
+            page = pages.get(node.url)
+            if page is None:
+                logger.error("Error parsing %s: article not returned by MediaWiki API", node.url)
+                results.append(False)
+                continue
+            node.apply(page)
+            results.append(self._settle(node, page.canonical_url))
+        return results
+
+    def _settle(self, node: _CrawlNode, canonical_url: Optional[str]) -> bool:
+        """
+        Переводит узел на канонический URL страницы.
+        Возвращает ``False``, если статья под этим URL уже есть в обходе
+        """
+        if not canonical_url or canonical_url == node.url:
+            return True
+        self.aliases[node.url] = canonical_url
+        if canonical_url in self.visited:
+            logger.debug("Article %s is an alias of already visited %s", node.url, canonical_url)
+            return False
+        logger.debug("Article %s is an alias of %s", node.url, canonical_url)
+        self.visited.add(canonical_url)
+        node.url = canonical_url
+        return True
+
+
+@asynccontextmanager
+async def _make_crawler(client: Optional[httpx.AsyncClient], **kwargs) -> AsyncIterator[WikiCrawler]:
+    """ Создаёт краулер; если клиент не передан, открывает и закрывает свой """
+    close_client = False
+
+    if client is None:
+        logger.debug("Creating new HTTP client")
+        client = httpx.AsyncClient()
+        close_client = True
+
+    try:
+        yield WikiCrawler(client=client, **kwargs)
+
+    finally:
+        if close_client:
+            logger.debug("Closing HTTP client")
+            await client.aclose()
+
 
 async def parse_wikipedia_article(
     url: str,
@@ -18,91 +356,85 @@ async def parse_wikipedia_article(
     visited: Optional[Set[str]] = None,
     base_url: str = settings.parser.wiki_base,
     timeout: int = settings.parser.timeout,
+    store_lookup: Optional[StoreLookup] = None,
+    on_page: Optional[PageCallback] = None,
+    aliases: Optional[Dict[str, str]] = None,
 ) -> Optional[WikiArticleSchema]:
     """
     Рекурсивно парсит статью Wikipedia и её связанные статьи
     """
 
-    if depth == 0:
-        logger.debug("Maximum depth reached for %r", url)
-        return None
-
     if visited is None:
         visited = set()
 
-    if url in visited:
-        logger.debug("Article already visited: %s", url)
-        return None
+    async with _make_crawler(
+        client,
+        visited=visited,
+        base_url=base_url,
+        timeout=timeout,
+        store_lookup=store_lookup,
+        on_page=on_page,
+        aliases=aliases,
+    ) as crawler:
+        return await crawler.crawl(url, depth)
 
-    visited.add(url)
-    close_client = False
 
-    if client is None:
-        logger.debug("Creating new HTTP client")
-        client = httpx.AsyncClient()
-        close_client = True
+async def parse_wikipedia_articles(
+    urls: Sequence[str],
+    depth: int,
+    client: Optional[httpx.AsyncClient] = None,
+    visited: Optional[Set[str]] = None,
+    base_url: str = settings.parser.wiki_base,
+    timeout: int = settings.parser.timeout,
+    store_lookup: Optional[StoreLookup] = None,
+    on_page: Optional[PageCallback] = None,
+    aliases: Optional[Dict[str, str]] = None,
+) -> Dict[str, Optional[WikiArticleSchema]]:
+    """
+    Парсит несколько статей Wikipedia и их связанные статьи за один обход
+    """
 
-    try:
-        logger.debug("Request to %r", url)
-        resp = await client.get(url, timeout=timeout)
-        resp.raise_for_status()
-        soup = BeautifulSoup(resp.text, "lxml")
-
-        # Извлекаем заголовок
-        title_tag = soup.find("h1", id="firstHeading")
-        title = title_tag.text.strip() if title_tag else url
-        logger.debug("Extracted title: %s", title)
-
-        # Извлекаем контент
-        content_div = soup.find("div", {"id": "mw-content-text"})
-        content = ""
-        if content_div:
-            paragraphs = content_div.find_all("p")
-            content = "\n".join(
-                p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)
-            )
-            logger.debug("Extracted content")
-
-        # Ищем ссылки на другие статьи
-        children = []
-        if content_div:
-            links = content_div.find_all("a", href=True)
-            logger.debug("Found %s links in article", len(links))
-            for link in links:
-                if len(children) >= 5:
-                    logger.debug("Maximum number of child articles reached")
-                    break
-
-                href = link.get("href", "")
-                if (
-                    isinstance(href, str)
-                    and href.startswith("/wiki/")
-                    and not any(x in href for x in [":", "#"])
-                ):
-                    child_url = urljoin(base_url, href)
-                    if child_url in visited:
-                        continue
-                    logger.debug("Processing child link: %s", child_url)
-                    child_article = await parse_wikipedia_article(
-                        child_url, depth - 1, client, visited
-                    )
-                    if child_article:
-                        children.append(child_article)
-                        logger.debug("Added child article: %s", child_article.title)
-        logger.info(
-            "Successfully parsed article: %s with %s child articles",
-            title,
-            len(children),
-        )
-        return WikiArticleSchema(
-            title=title, url=url, content=content, children=children
-        )
+    if visited is None:
+        visited = set()
 
-    except Exception as e:
-        logger.error(f"Error parsing %s: %s", url, e, exc_info=True)
-        return None
+    async with _make_crawler(
+        client,
+        visited=visited,
+        base_url=base_url,
+        timeout=timeout,
+        store_lookup=store_lookup,
+        on_page=on_page,
+        aliases=aliases,
+    ) as crawler:
+        return await crawler.crawl_many(urls, depth)
 
-    finally:
-        if close_client:
-            logger.debug("Closing HTTP client")
-            await client.aclose()
+
+async def iter_wikipedia_articles(
+    url: str,
+    depth: int,
+    client: Optional[httpx.AsyncClient] = None,
+    visited: Optional[Set[str]] = None,
+    base_url: str = settings.parser.wiki_base,
+    timeout: int = settings.parser.timeout,
+    store_lookup: Optional[StoreLookup] = None,
+    on_page: Optional[PageCallback] = None,
+    aliases: Optional[Dict[str, str]] = None,
+) -> AsyncIterator[List[CrawledArticleSchema]]:
+    """
+    Парсит статью Wikipedia и её связанные статьи, отдавая их по уровням
+    """
+
+    if visited is None:
+        visited = set()
+
+    async with _make_crawler(
+        client,
+        visited=visited,
+        base_url=base_url,
+        timeout=timeout,
+        store_lookup=store_lookup,
+        on_page=on_page,
+        aliases=aliases,
+    ) as crawler:
+        async for level in crawler.iter_crawl(url, depth):
+            yield level
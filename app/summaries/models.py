@@ -0,0 +1,13 @@
+from sqlalchemy import String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.db.mixins import CreatedAtMixin, UUIDIdIndexMixin
+from core.models import Base
+
+
+class SummaryCacheEntry(Base, UUIDIdIndexMixin, CreatedAtMixin):
+    __tablename__ = "summary_cache"
+
+    # sha256 от входного текста, модели и параметров генерации
+    key: Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    summary: Mapped[str] = mapped_column(Text, nullable=False)
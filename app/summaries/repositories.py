@@ -0,0 +1,6 @@
+from core.utils.repository import SQLAlchemyRepository
+from summaries.models import SummaryCacheEntry
+
+
+class SummaryCacheRepository(SQLAlchemyRepository):
+    model = SummaryCacheEntry
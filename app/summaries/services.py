@@ -0,0 +1,454 @@
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+import numpy as np
+
+import core.exceptions.articles as article_exceptions
+from core.config import settings
+from core.utils.cache import LRUCache
+from core.utils.circuit_breaker import CircuitBreaker
+from core.utils.summary_abstract import AbstractSummaryService
+from core.utils.unitofwork import UnitOfWork
+
+logger = logging.getLogger(settings.logger.logger_name)
+
+# Провайдеры цепочки, ответившие вместо основного во время текущего вызова
+# CachedSummaryService; общий для частей ChunkedSummaryService
+_substitute_providers: ContextVar[Optional[Set[str]]] = ContextVar("summary_substitute_providers", default=None)
+
+
+class CachedSummaryService(AbstractSummaryService):
+    """
+    Кэширует summary любого сервиса по хэшу входного текста, модели и параметров.
+
+    Сначала проверяется LRU-кэш в памяти процесса, затем таблица
+    ``summary_cache`` в Postgres; сервис вызывается только при промахе обоих.
+    Ошибки кэша не мешают генерации summary. Summary, в котором ответил не
+    основной провайдер цепочки, не кэшируется: ключ описывает основной.
+    """
+
+    def __init__(
+        self,
+        service: AbstractSummaryService,
+        memory: LRUCache[str],
+        persistent: bool = settings.summary.cache_persistent,
+    ) -> None:
+        self.service = service
+        self.memory = memory
+        self.persistent = persistent
+
+    def summary_params(self, text: str) -> Dict[str, Any]:
+        return self.service.summary_params(text)
+
+    @staticmethod
+    def cache_key(params: Dict[str, Any]) -> str:
+        payload = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    async def generate_summary(self, text: str) -> str:
+        key = self.cache_key(self.summary_params(text))
+
+        summary = self.memory.get(key)
+        if summary is not None:
+            logger.info("Summary cache hit (memory): %s", key)
+            return summary
+
+        if self.persistent:
+            summary = await self._load(key)
+            if summary is not None:
+                logger.info("Summary cache hit (database): %s", key)
+                self.memory.set(key, summary)
+                return summary
+
+        substitutes: Set[str] = set()
+        token = _substitute_providers.set(substitutes)
+        try:
+            summary = await self.service.generate_summary(text)
+        finally:
+            _substitute_providers.reset(token)
+        if substitutes:
+            logger.info("Summary generated by %s instead of the primary provider, not caching", sorted(substitutes))
+            return summary
+
+        self.memory.set(key, summary)
+        if self.persistent:
+            await self._store(key, summary)
+        return summary
+
+    @staticmethod
+    async def _load(key: str) -> Optional[str]:
+        try:
+            async with UnitOfWork() as uow:
+                entry = await uow.summary_cache.get(key=key)
+                return entry.summary if entry else None
+        except Exception as e:
+            logger.error("Summary cache lookup failed: %s", e, exc_info=True)
+            return None
+
+    @staticmethod
+    async def _store(key: str, summary: str) -> None:
+        try:
+            async with UnitOfWork() as uow:
+                await uow.summary_cache.add_or_get(
+                    {"key": key, "summary": summary, "created_at": datetime.utcnow()},
+                    conflict_cols=["key"],
+                )
+                await uow.commit()
+        except Exception as e:
+            logger.error("Summary cache store failed: %s", e, exc_info=True)
+
+
+class ChunkedSummaryService(AbstractSummaryService):
+    """
+    Map-reduce summary длинных текстов поверх любого сервиса.
+
+    Текст делится по границам абзацев на части не больше ``chunk_tokens``
+    токенов, части суммаризируются параллельно (не более ``concurrency``
+    одновременно), затем summary частей сводятся в итоговое. Если сведённый
+    текст сам не помещается в одну часть, шаг свёртки повторяется.
+    """
+
+    def __init__(
+        self,
+        service: AbstractSummaryService,
+        chunk_tokens: int = settings.summary.chunk_tokens,
+        chars_per_token: float = settings.summary.chars_per_token,
+        concurrency: int = settings.summary.chunk_concurrency,
+        max_chunks: int = settings.summary.max_chunks,
+    ) -> None:
+        self.service = service
+        self.chunk_chars = max(int(chunk_tokens * chars_per_token), 1)
+        self.concurrency = concurrency
+        self.max_chunks = max_chunks
+
+    def summary_params(self, text: str) -> Dict[str, Any]:
+        return {
+            "service": "chunked",
+            "chunk_chars": self.chunk_chars,
+            "max_chunks": self.max_chunks,
+            "inner": self.service.summary_params(""),
+            "text": text,
+        }
+
+    def split(self, text: str) -> List[str]:
+        """ Делит текст на части не длиннее ``chunk_chars`` по границам абзацев """
+        chunks, current = [], ""
+        for paragraph in self._pieces(text):
+            if current and len(current) + 1 + len(paragraph) > self.chunk_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n{paragraph}" if current else paragraph
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _pieces(self, text: str) -> List[str]:
+        # Абзацы длиннее части режем по предложениям, а если не выходит - по длине
+        pieces = []
+        for paragraph in filter(None, (line.strip() for line in text.splitlines())):
+            if len(paragraph) <= self.chunk_chars:
+                pieces.append(paragraph)
+                continue
+            for sentence in re.split(r"(?<=[.!?…])\s+", paragraph):
+                for start in range(0, len(sentence), self.chunk_chars):
+                    pieces.append(sentence[start:start + self.chunk_chars])
+        return pieces
+
+    async def generate_summary(self, text: str) -> str:
+        chunks = self.split(text)
+        if len(chunks) <= 1:
+            return await self.service.generate_summary(text)
+
+        if len(chunks) > self.max_chunks:
+            logger.warning(
+                "Text split into %s chunks, summarizing %s evenly spaced ones",
+                len(chunks),
+                self.max_chunks,
+            )
+            step = len(chunks) / self.max_chunks
+            chunks = [chunks[int(i * step)] for i in range(self.max_chunks)]
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        stage = 0
+        while len(chunks) > 1:
+            stage += 1
+            started = time.perf_counter()
+            partials = await self._map(chunks, semaphore)
+            logger.info(
+                "Map stage %s: %s chunks summarized in %.2fs",
+                stage,
+                len(chunks),
+                time.perf_counter() - started,
+            )
+            reduced = self.split("\n".join(partials))
+            if len(reduced) >= len(chunks):
+                # Summary частей не короче самих частей - сводим как есть
+                chunks = ["\n".join(partials)]
+                break
+            chunks = reduced
+
+        started = time.perf_counter()
+        summary = await self.service.generate_summary(chunks[0])
+        logger.info("Reduce stage: final summary in %.2fs", time.perf_counter() - started)
+        return summary
+
+    async def _map(self, chunks: List[str], semaphore: asyncio.Semaphore) -> List[str]:
+        async def summarize(chunk: str) -> str:
+            async with semaphore:
+                return await self.service.generate_summary(chunk)
+
+        results = await asyncio.gather(*(summarize(chunk) for chunk in chunks), return_exceptions=True)
+        partials = [result for result in results if not isinstance(result, BaseException)]
+        failed = len(results) - len(partials)
+        if failed:
+            logger.warning("Failed to summarize %s of %s chunks", failed, len(results))
+        if not partials:
+            raise next(result for result in results if isinstance(result, BaseException))
+        return partials
+
+
+class TextRankSummaryService(AbstractSummaryService):
+    """
+    Локальный экстрактивный summary (LexRank) без обращения к сети.
+
+    Предложения представляются TF-IDF векторами, граф строится по косинусному
+    сходству, вес предложений считается степенным методом PageRank. В summary
+    попадают ``sentences`` лучших предложений в порядке следования в тексте.
+    """
+
+    SENTENCE_RE = re.compile(r"(?<=[.!?…])\s+")
+    WORD_RE = re.compile(r"\w{3,}")
+
+    def __init__(
+        self,
+        sentences: int = settings.summary.local_sentences,
+        max_sentences: int = settings.summary.local_max_sentences,
+        damping: float = 0.85,
+        tolerance: float = 1e-6,
+        max_iterations: int = 100,
+    ) -> None:
+        self.sentences = sentences
+        self.max_sentences = max_sentences
+        self.damping = damping
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+
+    def summary_params(self, text: str) -> Dict[str, Any]:
+        return {
+            "service": "local",
+            "sentences": self.sentences,
+            "max_sentences": self.max_sentences,
+            "damping": self.damping,
+            "text": text,
+        }
+
+    async def generate_summary(self, text: str) -> str:
+        started = time.perf_counter()
+        summary = self.summarize(text)
+        logger.info(
+            "Local summary generated in %.3fs, length: %s characters",
+            time.perf_counter() - started,
+            len(summary),
+        )
+        return summary
+
+    def summarize(self, text: str) -> str:
+        sentences = [
+            sentence.strip()
+            for line in text.splitlines()
+            for sentence in self.SENTENCE_RE.split(line)
+            if sentence.strip()
+        ][:self.max_sentences]
+        if len(sentences) <= self.sentences:
+            return " ".join(sentences)
+
+        scores = self._rank(self._tfidf(sentences))
+        best = np.sort(np.argsort(-scores, kind="stable")[:self.sentences])
+        return " ".join(sentences[i] for i in best)
+
+    def _tfidf(self, sentences: List[str]) -> np.ndarray:
+        """ Матрица TF-IDF (предложения x слова) с нормированными строками """
+        vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, sentence in enumerate(sentences):
+            for word in self.WORD_RE.findall(sentence.lower()):
+                rows.append(row)
+                cols.append(vocabulary.setdefault(word, len(vocabulary)))
+
+        tf = np.zeros((len(sentences), max(len(vocabulary), 1)))
+        np.add.at(tf, (np.array(rows, dtype=int), np.array(cols, dtype=int)), 1.0)
+
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log((1 + len(sentences)) / (1 + df)) + 1.0
+        matrix = tf * idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+    def _rank(self, matrix: np.ndarray) -> np.ndarray:
+        """ PageRank по матрице косинусного сходства предложений """
+        n = matrix.shape[0]
+        similarity = matrix @ matrix.T
+        np.fill_diagonal(similarity, 0.0)
+
+        # Предложения без общих слов с другими ссылаются на все одинаково
+        row_sums = similarity.sum(axis=1, keepdims=True)
+        transition = np.where(row_sums > 0, similarity / np.where(row_sums > 0, row_sums, 1.0), 1.0 / n)
+
+        scores = np.full(n, 1.0 / n)
+        for _ in range(self.max_iterations):
+            updated = (1 - self.damping) / n + self.damping * (transition.T @ scores)
+            if np.abs(updated - scores).sum() < self.tolerance:
+                return updated
+            scores = updated
+        return scores
+
+
+class FallbackSummaryService(AbstractSummaryService):
+    """
+    Переключается на запасной сервис, если основной завершился ошибкой
+    или не уложился в ``timeout`` секунд.
+    """
+
+    def __init__(
+        self,
+        service: AbstractSummaryService,
+        fallback: AbstractSummaryService,
+        timeout: Optional[float] = settings.summary.latency_budget,
+    ) -> None:
+        self.service = service
+        self.fallback = fallback
+        self.timeout = timeout
+
+    def summary_params(self, text: str) -> Dict[str, Any]:
+        return self.service.summary_params(text)
+
+    async def generate_summary(self, text: str) -> str:
+        try:
+            return await asyncio.wait_for(self.service.generate_summary(text), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Summary service exceeded %ss, using fallback", self.timeout)
+        except Exception as e:
+            logger.warning("Summary service failed (%s), using fallback", e)
+        return await self.fallback.generate_summary(text)
+
+
+@dataclass
+class SummaryProvider:
+    """ Провайдер в цепочке: сервис, его таймаут и circuit breaker """
+
+    name: str
+    service: AbstractSummaryService
+    timeout: Optional[float]
+    breaker: CircuitBreaker
+
+
+class SummaryProviderChain(AbstractSummaryService):
+    """
+    Упорядоченная цепочка провайдеров summary с hedging.
+
+    Запрос уходит первому провайдеру. Если он не ответил за ``hedge_delay``
+    секунд, параллельно запускается следующий; при ошибке или таймауте
+    следующий запускается сразу. Побеждает первый успешный ответ, остальные
+    вызовы отменяются. Провайдеры с разомкнутым circuit breaker пропускаются.
+    Параметры summary - параметры первого (основного) провайдера.
+    """
+
+    def __init__(self, providers: List[SummaryProvider], hedge_delay: Optional[float] = None) -> None:
+        self.providers = providers
+        self.hedge_delay = hedge_delay
+
+    def summary_params(self, text: str) -> Dict[str, Any]:
+        return self.providers[0].service.summary_params(text)
+
+    async def generate_summary(self, text: str) -> str:
+        queue = iter(self.providers)
+        pending: Dict[asyncio.Task, SummaryProvider] = {}
+        self._launch_next(queue, pending, text)
+
+        try:
+            while pending:
+                done, _ = await asyncio.wait(
+                    pending, timeout=self.hedge_delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    if self._launch_next(queue, pending, text):
+                        logger.info("Summary provider is slow, sending hedged request")
+                    continue
+
+                failed = 0
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is None:
+                        logger.info("Summary generated by provider %r", provider.name)
+                        substitutes = _substitute_providers.get()
+                        if substitutes is not None and provider is not self.providers[0]:
+                            substitutes.add(provider.name)
+                        return task.result()
+                    logger.warning("Summary provider %r failed: %r", provider.name, task.exception())
+                    failed += 1
+                for _ in range(failed):
+                    self._launch_next(queue, pending, text)
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        logger.error("All summary providers failed or are unavailable")
+        raise article_exceptions.FailedGeneratingSummaryException()
+
+    def _launch_next(
+        self,
+        queue: Iterator[SummaryProvider],
+        pending: Dict[asyncio.Task, SummaryProvider],
+        text: str,
+    ) -> bool:
+        for provider in queue:
+            if provider.breaker.allow():
+                pending[asyncio.create_task(self._call(provider, text))] = provider
+                return True
+            logger.debug("Skipping summary provider %r: circuit breaker is open", provider.name)
+        return False
+
+    @staticmethod
+    async def _call(provider: SummaryProvider, text: str) -> str:
+        try:
+            summary = await asyncio.wait_for(provider.service.generate_summary(text), timeout=provider.timeout)
+        except asyncio.CancelledError:
+            provider.breaker.release()
+            raise
+        except Exception:
+            provider.breaker.record_failure()
+            raise
+        provider.breaker.record_success()
+        return summary
+
+
+# Состояние circuit breaker провайдеров общее для всех запросов процесса
+summary_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_summary_breaker(name: str) -> CircuitBreaker:
+    if name not in summary_breakers:
+        summary_breakers[name] = CircuitBreaker(
+            name=name,
+            failure_threshold=settings.summary.breaker_failures,
+            reset_timeout=settings.summary.breaker_reset_timeout,
+        )
+    return summary_breakers[name]
+
+
+summary_memory_cache: LRUCache[str] = LRUCache(maxsize=settings.summary.cache_size)
+
+# Ответы /wiki/summary по нормализованному URL
+summary_response_cache: LRUCache[Any] = LRUCache(
+    maxsize=settings.summary.response_cache_size,
+    ttl=settings.summary.response_cache_ttl,
+)
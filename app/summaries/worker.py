@@ -0,0 +1,148 @@
+import asyncio
+import itertools
+import logging
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.config import settings
+from core.utils.summary_abstract import AbstractSummaryService
+from core.utils.unitofwork import UnitOfWork
+from parsers.rate_limiter import TokenBucket
+from parsers.urls import canonicalize_url
+from summaries.services import summary_response_cache
+
+logger = logging.getLogger(settings.logger.logger_name)
+
+# (-число запросов summary, уровень статьи): меньше - раньше
+Priority = Tuple[int, int]
+
+
+class BackgroundSummarizer:
+    """
+    Фоновая генерация summary дочерних статей.
+
+    Статьи попадают в очередь с приоритетом: сначала те, чьё summary уже
+    запрашивали (чем чаще, тем раньше), затем по уровню в дереве. Очередь
+    разбирают ``workers`` обработчиков, не чаще ``rate`` генераций в секунду.
+    При старте в очередь добавляются сохранённые дочерние статьи без summary.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        rate: float,
+        burst: int,
+        max_queued: int,
+        backfill_limit: int,
+    ) -> None:
+        self.workers = workers
+        self.max_queued = max_queued
+        self.backfill_limit = backfill_limit
+        self._bucket = TokenBucket(rate, burst) if rate > 0 else None
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._queued: Dict[uuid.UUID, Priority] = {}
+        self._requests: Counter = Counter()
+        self._order = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+        self._service_factory: Optional[Callable[[], AbstractSummaryService]] = None
+
+    async def start(self, service_factory: Callable[[], AbstractSummaryService]) -> None:
+        self._service_factory = service_factory
+        self._queue = asyncio.PriorityQueue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info("Started %s background summary workers", self.workers)
+
+        try:
+            async with UnitOfWork() as uow:
+                article_ids = await uow.articles.list_ids_without_summary(limit=self.backfill_limit)
+        except Exception as e:
+            logger.error("Failed to load articles without summary: %s", e, exc_info=True)
+            return
+
+        self.submit_many((article_id, settings.parser.death) for article_id in article_ids)
+        if article_ids:
+            logger.info("Queued %s articles without summary", len(article_ids))
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._queued.clear()
+        self._requests.clear()
+
+    def submit_many(self, articles: Iterable[Tuple[uuid.UUID, int]]) -> None:
+        """ Ставит в очередь статьи (id, уровень в дереве) """
+        for article_id, level in articles:
+            self._put(article_id, (-self._requests[article_id], level))
+
+    def request(self, article_id: uuid.UUID) -> None:
+        """ Summary статьи запросили, но его ещё нет - поднимаем её в очереди """
+        # Считаются только запросы статей в очереди: счётчик сбрасывает обработчик
+        requests = self._requests[article_id] + 1
+        if self._put(article_id, (-requests, 0)):
+            self._requests[article_id] = requests
+
+    def _put(self, article_id: uuid.UUID, priority: Priority) -> bool:
+        """ Ставит статью в очередь, возвращает, стоит ли она теперь в очереди """
+        if self._queue is None:
+            return False
+        queued = self._queued.get(article_id)
+        if queued is not None and queued <= priority:
+            return True
+        if queued is None and len(self._queued) >= self.max_queued:
+            logger.debug("Summary queue is full, skipping article %s", article_id)
+            return False
+        # Прежняя запись остаётся в очереди и будет пропущена обработчиком
+        self._queued[article_id] = priority
+        self._queue.put_nowait((priority, next(self._order), article_id))
+        return True
+
+    async def _worker(self) -> None:
+        while True:
+            priority, _, article_id = await self._queue.get()
+            if self._queued.get(article_id) != priority:
+                self._queue.task_done()
+                continue
+            del self._queued[article_id]
+            try:
+                if self._bucket is not None:
+                    await self._bucket.acquire()
+                await self._summarize(article_id)
+            except Exception as e:
+                logger.error("Background summary of article %s failed: %s", article_id, e)
+            finally:
+                self._requests.pop(article_id, None)
+                self._queue.task_done()
+
+    async def _summarize(self, article_id: uuid.UUID) -> None:
+        async with UnitOfWork() as uow:
+            if await uow.article_summaries.get(article_id=article_id):
+                return
+            article = await uow.articles.get(article_id)
+        if not article or not article.content:
+            return
+
+        summary = await self._service_factory().generate_summary(text=article.content)
+
+        now = datetime.utcnow()
+        async with UnitOfWork() as uow:
+            await uow.article_summaries.add_or_get(
+                {"article_id": article_id, "summary": summary, "created_at": now, "updated_at": now},
+                conflict_cols=["article_id"],
+            )
+            await uow.commit()
+        summary_response_cache.pop(canonicalize_url(article.url))
+        logger.info("Background summary saved for article ID: %s", article_id)
+
+
+background_summarizer = BackgroundSummarizer(
+    workers=settings.summary.background_workers,
+    rate=settings.summary.background_rate,
+    burst=settings.summary.background_burst,
+    max_queued=settings.summary.background_max_queued,
+    backfill_limit=settings.summary.background_backfill_limit,
+)
@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select, text
+
+from articles.models import Article
+from articles.repositories import _article_id_by_url
+from articles.services import ArticleService
+from core.utils.unitofwork import UnitOfWork
+from parsers.urls import canonicalize_url
+
+pytestmark = pytest.mark.anyio
+
+TARGET_URL = canonicalize_url("https://ru.wikipedia.org/wiki/Цель")
+ALIAS_URL = canonicalize_url("https://ru.wikipedia.org/wiki/Перенаправление")
+
+
+async def save_article(uow, url: str) -> dict:
+    ids = await uow.articles.add_or_refresh_many(
+        [{"url": url, "title": url, "content": "", "fetched_at": datetime.utcnow()}]
+    )
+    return ids
+
+
+async def test_get_by_url_resolves_alias(db):
+    async with UnitOfWork() as uow:
+        ids = await save_article(uow, TARGET_URL)
+        await uow.article_aliases.upsert_many({ALIAS_URL: TARGET_URL})
+        await uow.commit()
+
+    async with UnitOfWork() as uow:
+        by_url = await uow.articles.get_by_url("https://ru.m.wikipedia.org/wiki/цель")
+        by_alias = await uow.articles.get_by_url(ALIAS_URL)
+        missing = await uow.articles.get_by_url("https://ru.wikipedia.org/wiki/Нет")
+    assert by_url.id == by_alias.id == ids[TARGET_URL]
+    assert missing is None
+
+
+async def test_article_id_lookup_uses_indexes(db):
+    stmt = select(Article.id).where(Article.id == _article_id_by_url(ALIAS_URL))
+    sql = stmt.compile(compile_kwargs={"literal_binds": True})
+    async with UnitOfWork() as uow:
+        await uow.session.execute(text("SET LOCAL enable_seqscan = off"))
+        plan = "\n".join(row[0] for row in await uow.session.execute(text(f"EXPLAIN {sql}")))
+    assert "Seq Scan" not in plan
+
+
+async def test_links_to_articles_saved_later_are_resolved(db):
+    source_url = canonicalize_url("https://ru.wikipedia.org/wiki/Источник")
+    later_url = canonicalize_url("https://ru.wikipedia.org/wiki/Позже")
+    async with UnitOfWork() as uow:
+        source_id = (await save_article(uow, source_url))[source_url]
+        await uow.articles.replace_links({source_id: [later_url, ALIAS_URL]})
+        await uow.commit()
+
+    async with UnitOfWork() as uow:
+        assert await uow.articles.get_neighbours(source_id, "out", 10) == []
+        later_id = (await save_article(uow, later_url))[later_url]
+        await uow.articles.replace_links({later_id: [source_url]})
+        target_id = (await save_article(uow, TARGET_URL))[TARGET_URL]
+        await uow.article_aliases.upsert_many({ALIAS_URL: TARGET_URL})
+        await uow.commit()
+
+    async with UnitOfWork() as uow:
+        out = await uow.articles.get_neighbours(source_id, "out", 10)
+        both = await uow.articles.get_neighbours(source_id, "both", 10)
+        limited = await uow.articles.get_neighbours(source_id, "both", 2)
+    assert [row.id for row in out] == [later_id, target_id]
+    assert [(row.id, row.direction) for row in both] == [(later_id, "out"), (target_id, "out"), (later_id, "in")]
+    assert len(limited) == 2
+
+
+async def test_advisory_lock_waiter_sees_summary_saved_meanwhile(db):
+    service = ArticleService(summary_service=None)
+    lock_key = (TARGET_URL, 2)
+    async with UnitOfWork() as uow:
+        article_id = (await save_article(uow, TARGET_URL))[TARGET_URL]
+        await uow.article_summaries.upsert_many([{"article_id": article_id, "summary": "Старое"}])
+        await uow.commit()
+    async with UnitOfWork() as uow:
+        created = await uow.article_summaries.get_updated_at(TARGET_URL)
+
+    async with UnitOfWork() as holder:
+        assert await service._acquire_parse_lock(TARGET_URL, holder, lock_key) is None
+        async with UnitOfWork() as waiter:
+            waiting = asyncio.create_task(service._acquire_parse_lock(TARGET_URL, waiter, lock_key))
+            await asyncio.sleep(0.2)
+            assert not waiting.done()
+            # Пока второй ждёт, первый перезаписывает summary уже сохранённой статьи
+            await holder.article_summaries.upsert_many([{"article_id": article_id, "summary": "Новое"}])
+            await holder.commit()
+            assert await waiting == str(article_id)
+
+    async with UnitOfWork() as uow:
+        summary = await uow.article_summaries.get(article_id=article_id)
+    assert summary.summary == "Новое"
+    assert summary.updated_at > created.updated_at
+    assert summary.created_at == created.updated_at
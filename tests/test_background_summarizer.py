@@ -0,0 +1,28 @@
+import asyncio
+import uuid
+
+import pytest
+
+from summaries.worker import BackgroundSummarizer
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_requests_are_counted_only_for_queued_articles():
+    summarizer = BackgroundSummarizer(workers=0, rate=0, burst=1, max_queued=2, backfill_limit=0)
+    # Без start: очередь без обработчиков и без обращения к БД
+    summarizer._queue = asyncio.PriorityQueue()
+    queued = [uuid.uuid4(), uuid.uuid4()]
+
+    for article_id in queued:
+        summarizer.request(article_id)
+    summarizer.request(queued[0])
+    for _ in range(100):
+        summarizer.request(uuid.uuid4())
+
+    assert summarizer._requests == {queued[0]: 2, queued[1]: 1}
+    assert set(summarizer._queued) == set(queued)
+
+    await summarizer.stop()
+    summarizer.request(queued[0])
+    assert not summarizer._requests
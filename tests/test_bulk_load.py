@@ -0,0 +1,87 @@
+from datetime import datetime
+
+import pytest
+
+from articles.services import ArticleService
+from core.utils.unitofwork import UnitOfWork
+from parsers.urls import canonicalize_url
+
+pytestmark = pytest.mark.anyio
+
+ROOT_URL = canonicalize_url("https://ru.wikipedia.org/wiki/Корень")
+CHILD_URL = canonicalize_url("https://ru.wikipedia.org/wiki/Потомок")
+
+
+def make_record(url: str, parent_url=None) -> dict:
+    return {
+        "url": url,
+        "title": url.rsplit("/", 1)[-1],
+        "content": "Текст",
+        "links": [],
+        "fetched_at": datetime.utcnow(),
+        "parent_url": parent_url,
+    }
+
+
+async def test_bulk_load_on_new_unit_of_work(db):
+    async with UnitOfWork() as uow:
+        ids = await uow.articles.bulk_load([make_record(ROOT_URL), make_record(CHILD_URL, ROOT_URL)])
+        await uow.commit()
+
+    assert set(ids) == {ROOT_URL, CHILD_URL}
+    async with UnitOfWork() as uow:
+        child = await uow.articles.get_by_url(CHILD_URL)
+    assert child.id == ids[CHILD_URL]
+    assert child.parent_id == ids[ROOT_URL]
+
+
+async def test_bulk_load_twice_in_one_transaction(db):
+    async with UnitOfWork() as uow:
+        first = await uow.articles.bulk_load([make_record(ROOT_URL)])
+        second = await uow.articles.bulk_load([make_record(ROOT_URL), make_record(CHILD_URL, ROOT_URL)])
+        await uow.commit()
+
+    assert second[ROOT_URL] == first[ROOT_URL]
+    assert set(second) == {ROOT_URL, CHILD_URL}
+
+
+async def test_bulk_load_keeps_parent_of_stored_articles(db):
+    other_url = canonicalize_url("https://ru.wikipedia.org/wiki/Другой_корень")
+    async with UnitOfWork() as uow:
+        record = make_record(ROOT_URL)
+        del record["parent_url"], record["links"]
+        root_id = (await uow.articles.add_or_refresh_many([record]))[ROOT_URL]
+        await uow.commit()
+
+    # Сохранённый корень встретился в другом обходе потомком, как и новая статья
+    async with UnitOfWork() as uow:
+        ids = await uow.articles.bulk_load(
+            [make_record(other_url), make_record(ROOT_URL, other_url), make_record(CHILD_URL, other_url)]
+        )
+        await uow.commit()
+
+    async with UnitOfWork() as uow:
+        root = await uow.articles.get_by_url(ROOT_URL)
+        child = await uow.articles.get_by_url(CHILD_URL)
+    assert ids[ROOT_URL] == root.id == root_id
+    assert root.parent_id is None
+    assert child.parent_id == ids[other_url]
+
+
+async def test_stored_pages_reuse_links_saved_by_bulk_load(db):
+    links = [CHILD_URL, "https://ru.wikipedia.org/wiki/%D0%94%D0%B0%D0%BB%D1%8C%D1%88%D0%B5", ROOT_URL]
+    async with UnitOfWork() as uow:
+        ids = await uow.articles.bulk_load(
+            [{**make_record(ROOT_URL), "links": links}, make_record(CHILD_URL, ROOT_URL)]
+        )
+        await uow.commit()
+
+    async with UnitOfWork() as uow:
+        pages = await ArticleService._stored_pages_lookup(uow)([ROOT_URL, CHILD_URL])
+        neighbours = await uow.articles.get_neighbours(ids[ROOT_URL], "out", 10)
+
+    # Ссылки из article_links в порядке на странице, без ссылки на саму статью
+    assert pages[ROOT_URL].links == links[:2]
+    assert [row.id for row in neighbours] == [ids[CHILD_URL]]
+    # Статья без сохранённых ссылок загружается заново
+    assert CHILD_URL not in pages
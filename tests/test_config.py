@@ -0,0 +1,18 @@
+import pytest
+from pydantic import ValidationError
+
+from core.config import SummaryConfig
+
+
+@pytest.mark.parametrize(
+    "config",
+    [{"provider": "deepseek"}, {"providers": [{"name": "free_gpt"}, {"name": "openai", "timeout": 30}]}],
+)
+def test_unimplemented_summary_provider_is_rejected(config):
+    with pytest.raises(ValidationError):
+        SummaryConfig(**config)
+
+
+def test_summary_provider_chain():
+    config = SummaryConfig(providers=[{"name": "free_gpt", "timeout": 20}, {"name": "local", "timeout": 5}])
+    assert [provider.name for provider in config.providers] == ["free_gpt", "local"]
@@ -0,0 +1,122 @@
+import asyncio
+import uuid
+
+import pytest
+
+from articles.schemas import BatchParseItemResult
+from articles.services import ArticleService
+from core.utils.unitofwork import UnitOfWork
+from jobs.schemas import CrawlJobCreateSchema, JobStatus
+from jobs.services import CrawlJobService
+from jobs.worker import CrawlJobWorkerPool, JobProgress
+
+pytestmark = pytest.mark.anyio
+
+
+class StuckArticleService(ArticleService):
+    """ Парсинг, который не завершается, пока его не отменят """
+
+    def __init__(self) -> None:
+        super().__init__(summary_service=None)
+
+    async def _parse_and_save(self, url, uow, depth, on_page, lock_key):
+        on_page(url, 1)
+        await asyncio.Event().wait()
+
+
+class SlowArticleService(ArticleService):
+    """ Парсинг из трёх страниц с паузами между ними """
+
+    def __init__(self) -> None:
+        super().__init__(summary_service=None)
+
+    async def _parse_and_save(self, url, uow, depth, on_page, lock_key):
+        for level in (1, 2, 2):
+            on_page(f"{url}/{level}", level)
+            await asyncio.sleep(0.01)
+        return "article-id"
+
+
+class BatchArticleService(ArticleService):
+    """ Пакетный парсинг, в котором первая статья загружается, а вторая - нет """
+
+    article_id = uuid.uuid4()
+
+    def __init__(self) -> None:
+        super().__init__(summary_service=None)
+
+    async def parse_and_save_wiki_articles(self, urls, uow, depth, on_page=None):
+        on_page(urls[0], 1)
+        return [
+            BatchParseItemResult(url=urls[0], article_id=self.article_id),
+            BatchParseItemResult(url=urls[1], error=f"Failed to parse article: {urls[1]}"),
+        ]
+
+
+async def wait_for_status(job_id, status: str) -> None:
+    for _ in range(200):
+        async with UnitOfWork() as uow:
+            job = await uow.crawl_jobs.get(job_id)
+        if job.status == status:
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not reach status {status}")
+
+
+async def test_stop_returns_running_jobs_to_queue(db):
+    async with UnitOfWork() as uow:
+        job_data = CrawlJobCreateSchema(url="https://ru.wikipedia.org/wiki/A", depth=2)
+        job = await uow.crawl_jobs.add(job_data.model_dump())
+        await uow.commit()
+
+    pool = CrawlJobWorkerPool(workers=1, progress_interval=60, stale_after=600)
+    await pool.start(StuckArticleService)
+    await wait_for_status(job.id, JobStatus.RUNNING)
+    await pool.stop()
+
+    async with UnitOfWork() as uow:
+        job = await uow.crawl_jobs.get(job.id)
+    assert job.status == JobStatus.QUEUED
+    assert job.started_at is None
+
+
+async def test_coalesced_parse_reports_progress_to_follower():
+    leader, follower = JobProgress(), JobProgress()
+    service = SlowArticleService()
+    url = "https://ru.wikipedia.org/wiki/B"
+
+    async def join_later():
+        await asyncio.sleep(0.015)
+        return await service.parse_and_save_wiki_article(url, uow=None, depth=2, on_page=follower.on_page)
+
+    results = await asyncio.gather(
+        service.parse_and_save_wiki_article(url, uow=None, depth=2, on_page=leader.on_page),
+        join_later(),
+    )
+
+    assert results == ["article-id", "article-id"]
+    assert follower.pages_fetched == leader.pages_fetched == 3
+    assert follower.depth_reached == 2
+
+
+async def test_batch_job_reports_result_per_url(db):
+    urls = ["https://ru.wikipedia.org/wiki/C", "https://ru.wikipedia.org/wiki/D"]
+    pool = CrawlJobWorkerPool(workers=1, progress_interval=60, stale_after=600)
+    await pool.start(BatchArticleService)
+    service = CrawlJobService(pool)
+    try:
+        async with UnitOfWork() as uow:
+            job_id = await service.enqueue_batch(urls, depth=2, uow=uow)
+        await wait_for_status(job_id, JobStatus.DONE)
+    finally:
+        await pool.stop()
+
+    async with UnitOfWork() as uow:
+        job = await service.get_job_status(job_id, uow=uow)
+    assert job.url == urls[0]
+    assert job.urls == urls
+    assert job.pages_fetched == 1
+    assert job.results == [
+        BatchParseItemResult(url=urls[0], article_id=BatchArticleService.article_id),
+        BatchParseItemResult(url=urls[1], error=f"Failed to parse article: {urls[1]}"),
+    ]
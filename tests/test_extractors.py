@@ -0,0 +1,47 @@
+from pathlib import Path
+
+import pytest
+
+from parsers.extractors import extract_page
+from parsers.lxml_extractor import extract_page_lxml
+from parsers.urls import canonicalize_url
+
+BASE = "https://ru.wikipedia.org"
+URL = f"{BASE}/wiki/Python"
+
+# Страницы Википедии: полная, вариант action=render и перенаправление в action=render
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "html"
+HTML_FIXTURES = sorted(FIXTURES_DIR.glob("*.html"))
+
+
+@pytest.mark.parametrize("path", HTML_FIXTURES, ids=lambda path: path.stem)
+def test_lxml_extractor_matches_bs4(path):
+    html = path.read_text(encoding="utf-8")
+
+    page = extract_page_lxml(html, URL, BASE)
+
+    assert page == extract_page(html, URL, BASE)
+    # Комментарии, скрипты и стили не попадают в текст
+    assert "NewPP" not in page.content
+    assert "mw.loader" not in page.content
+    assert "white-space" not in page.content
+
+
+def test_full_page_content_and_links():
+    html = (FIXTURES_DIR / "python_full.html").read_text(encoding="utf-8")
+    page = extract_page_lxml(html, URL, BASE)
+
+    assert page.title == "Python"
+    assert page.canonical_url == canonicalize_url(URL)
+    assert page.redirect_url is None
+    # Части текста внутри абзаца склеиваются без пробелов, переводы строк внутри частей сохраняются
+    assert page.content.splitlines()[1] == (
+        "программированияобщего назначения сдинамической   строгой типизациейи автоматическимуправлением памятью."
+    )
+    # Ссылки без служебных пространств имён и якорей, без повторов, в порядке на странице
+    assert page.links[:2] == [
+        canonicalize_url(f"{BASE}/wiki/Python_(значения)"),
+        canonicalize_url(f"{BASE}/wiki/Объектно-ориентированное_программирование"),
+    ]
+    assert len(page.links) == len(set(page.links)) == 10
+    assert not any(":" in link.split("/wiki/")[1] for link in page.links)
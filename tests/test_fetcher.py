@@ -0,0 +1,169 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from parsers import wiki_parser
+from parsers.concurrency import AIMDConcurrencyLimiter
+from parsers.fetcher import PageFetcher
+from parsers.rate_limiter import HostRateLimiter
+
+pytestmark = pytest.mark.anyio
+
+BASE = "https://ru.wikipedia.org"
+URL = f"{BASE}/wiki/Питон"
+
+
+def replay(*responses: httpx.Response):
+    """ Обработчик MockTransport, отдающий ``responses`` по очереди """
+    responses = iter(responses)
+    return lambda request: next(responses)
+
+
+def make_fetcher(handler, **kwargs) -> PageFetcher:
+    options = {
+        "rate_limiter": HostRateLimiter(rate=0, capacity=1),
+        "concurrency_limiter": AIMDConcurrencyLimiter(initial=10, adaptive=False),
+        "backoff_base": 0.001,
+        "backoff_max": 0.01,
+        **kwargs,
+    }
+    return PageFetcher(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), **options)
+
+
+async def test_retry_after_is_honoured_in_full_and_frees_the_slot():
+    limiter = AIMDConcurrencyLimiter(initial=1, adaptive=False)
+    fetcher = make_fetcher(
+        replay(httpx.Response(429, headers={"Retry-After": "0.3"}), httpx.Response(200, text="ok")),
+        concurrency_limiter=limiter,
+    )
+
+    started_at = time.monotonic()
+    task = asyncio.create_task(fetcher.get(URL))
+    await asyncio.sleep(0.1)
+    # Во время паузы перед повтором слот свободен
+    assert limiter.in_flight == 0
+
+    resp = await task
+    assert resp.text == "ok"
+    # Retry-After больше backoff_max, но не урезается до него
+    assert time.monotonic() - started_at >= 0.3
+
+
+async def test_too_long_retry_after_fails_without_retry():
+    fetcher = make_fetcher(
+        replay(httpx.Response(429, headers={"Retry-After": "3600"}), httpx.Response(200)), max_retry_after=60
+    )
+    with pytest.raises(httpx.HTTPStatusError):
+        await fetcher.get(URL)
+
+
+async def test_retry_after_pauses_the_host():
+    rate_limiter = HostRateLimiter(rate=100, capacity=10)
+    fetcher = make_fetcher(
+        replay(httpx.Response(429, headers={"Retry-After": "0.2"}), httpx.Response(200)), rate_limiter=rate_limiter
+    )
+
+    task = asyncio.create_task(fetcher.get(URL))
+    await asyncio.sleep(0.05)
+    # Другие запросы к тому же хосту ждут окончания Retry-After
+    started_at = time.monotonic()
+    await rate_limiter.acquire("ru.wikipedia.org")
+    assert time.monotonic() - started_at >= 0.1
+    await task
+
+
+async def test_retries_are_limited():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(503)
+
+    fetcher = make_fetcher(handler, max_retries=2)
+    with pytest.raises(httpx.HTTPStatusError):
+        await fetcher.get(URL)
+    assert len(requests) == 3
+
+
+async def test_wave_of_429_decreases_limit_once():
+    limiter = AIMDConcurrencyLimiter(initial=8, min_limit=1, max_limit=16)
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        # Первая волна одновременных запросов получает 429
+        status = 429 if len(requests) <= 8 else 200
+        await asyncio.sleep(0.01)
+        return httpx.Response(status)
+
+    fetcher = make_fetcher(handler, concurrency_limiter=limiter)
+    responses = await asyncio.gather(*(fetcher.get(f"{URL}_{i}") for i in range(8)))
+
+    assert [resp.status_code for resp in responses] == [200] * 8
+    assert len(requests) == 16
+    history = limiter.stats()["history"]
+    assert [(item["previous_limit"], item["limit"], item["reason"]) for item in history][0] == (8, 4, "congestion")
+    assert sum(item["reason"] == "congestion" for item in history) == 1
+    # После волны лимит снова растёт
+    assert 4 < limiter.limit < 8
+
+
+async def test_slow_responses_decrease_limit():
+    limiter = AIMDConcurrencyLimiter(initial=4, latency_threshold=0.05)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(0.1)
+        return httpx.Response(200)
+
+    await make_fetcher(handler, concurrency_limiter=limiter).get(URL)
+
+    assert limiter.limit == 2
+    assert limiter.stats()["history"][-1]["reason"].startswith("latency")
+
+
+async def test_idle_limit_does_not_grow():
+    limiter = AIMDConcurrencyLimiter(initial=4, max_limit=50)
+    fetcher = make_fetcher(replay(*(httpx.Response(200) for _ in range(20))), concurrency_limiter=limiter)
+
+    # Последовательные запросы не загружают лимит - поводов его поднимать нет
+    for i in range(20):
+        await fetcher.get(f"{URL}_{i}")
+    assert limiter.limit == 4
+    assert limiter.stats()["history"] == []
+
+
+async def test_aimd_limit_caps_crawl(monkeypatch):
+    limiter = AIMDConcurrencyLimiter(initial=16, min_limit=1, max_limit=50)
+    monkeypatch.setattr(wiki_parser, "crawl_concurrency", limiter)
+    children = [f"Статья_{i}" for i in range(30)]
+    in_flight = []
+    peaks = []
+    requests = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        title = request.url.path.removeprefix("/wiki/")
+        requests.append(title)
+        in_flight.append(title)
+        peaks.append((len(requests), len(in_flight)))
+        await asyncio.sleep(0.02)
+        in_flight.remove(title)
+        # Первая волна дочерних страниц получает 429
+        if 1 < len(requests) <= 17:
+            return httpx.Response(429)
+        links = "".join(f'<a href="/wiki/{child}">{child}</a>' for child in children) if title == "Корень" else ""
+        return httpx.Response(200, text=f'<div id="mw-content-text"><p>{title}</p>{links}</div>')
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        crawler = wiki_parser.WikiCrawler(client=client, visited=set(), max_children=len(children))
+        crawler.fetcher.rate_limiter = HostRateLimiter(rate=0, capacity=1)
+        crawler.fetcher.backoff_base = crawler.fetcher.backoff_max = 0.001
+        article = await crawler.crawl(f"{BASE}/wiki/Корень", 2)
+
+    assert len(article.children) == len(children)
+    # Все 30 дочерних страниц готовы к загрузке сразу: одновременно идёт ровно лимит, других ограничений нет
+    assert max(peak for _, peak in peaks) == 16
+    # После волны 429 лимит вдвое меньше и ограничивает обход
+    assert limiter.stats()["history"][0]["limit"] == 8
+    assert max(peak for number, peak in peaks if number > 17) <= 9
@@ -0,0 +1,84 @@
+import json
+from pathlib import Path
+
+import httpx
+import pytest
+
+from parsers.urls import url_from_title
+from parsers.wiki_parser import WikiCrawler
+
+pytestmark = pytest.mark.anyio
+
+BASE = "https://ru.wikipedia.org"
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "mediawiki_api"
+
+
+class RecordedApi:
+    """ Заглушка MediaWiki API: отдаёт записанные ответы по названиям и продолжению """
+
+    def __init__(self, name: str) -> None:
+        self.exchanges = json.loads((FIXTURES_DIR / f"{name}.json").read_text())
+        self.requests = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        params = dict(request.url.params)
+        self.requests.append(params)
+        assert request.url.path == "/w/api.php"
+        assert params["action"] == "query" and params["redirects"] == "1"
+        for exchange in self.exchanges:
+            expected = exchange["params"]
+            if expected["titles"] == params["titles"] and expected.get("plcontinue") == params.get("plcontinue"):
+                return httpx.Response(200, json=exchange["response"])
+        return httpx.Response(404)
+
+
+async def test_api_backend_builds_tree_from_recorded_responses():
+    api = RecordedApi("python_depth2")
+    async with httpx.AsyncClient(transport=httpx.MockTransport(api)) as client:
+        crawler = WikiCrawler(client=client, visited=set(), backend="api", max_children=2)
+        crawler.api.intro_only = True
+        article = await crawler.crawl(f"{BASE}/wiki/Питон_(язык)", 2)
+
+    assert len(api.requests) == 3
+    assert article.title == "Python"
+    assert article.url == url_from_title(BASE, "Python")
+    assert article.content == (
+        "Python — высокоуровневый язык программирования общего назначения.\n"
+        "История\n"
+        "Разработка языка была начата в конце 1980-х годов."
+    )
+    # Ссылки из обеих страниц продолжения, в порядке API (по алфавиту)
+    assert article.links == [
+        url_from_title(BASE, "CPython"),
+        url_from_title(BASE, "Гвидо ван Россум"),
+        url_from_title(BASE, "Язык программирования"),
+    ]
+    assert [child.title for child in article.children] == ["CPython", "Гвидо ван Россум"]
+    assert article.children[1].links == [url_from_title(BASE, "Python"), url_from_title(BASE, "Нидерланды")]
+    assert crawler.aliases == {url_from_title(BASE, "Питон (язык)"): article.url}
+
+
+class FailingBatchApi(RecordedApi):
+    """ Отвечает ошибкой API на пакет из нескольких статей и отдаёт статьи этого пакета по одной """
+
+    def __init__(self, name: str, failing_titles: str) -> None:
+        super().__init__(name)
+        pages = next(e for e in self.exchanges if e["params"]["titles"] == failing_titles)["response"]["query"]["pages"]
+        self.exchanges = [e for e in self.exchanges if e["params"]["titles"] != failing_titles]
+        error = {"error": {"code": "internal_api_error", "info": "Internal error"}}
+        self.exchanges.append({"params": {"titles": failing_titles}, "response": error})
+        for page in pages:
+            self.exchanges.append({"params": {"titles": page["title"]}, "response": {"query": {"pages": [page]}}})
+
+
+async def test_api_backend_requests_failed_batch_one_by_one():
+    api = FailingBatchApi("python_depth2", "CPython|Гвидо ван Россум")
+    async with httpx.AsyncClient(transport=httpx.MockTransport(api)) as client:
+        crawler = WikiCrawler(client=client, visited=set(), backend="api", max_children=2)
+        crawler.api.intro_only = True
+        article = await crawler.crawl(f"{BASE}/wiki/Питон_(язык)", 2)
+
+    titles = [params["titles"] for params in api.requests[2:]]
+    assert titles == ["CPython|Гвидо ван Россум", "CPython", "Гвидо ван Россум"]
+    assert [child.title for child in article.children] == ["CPython", "Гвидо ван Россум"]
+    assert article.children[1].links == [url_from_title(BASE, "Python"), url_from_title(BASE, "Нидерланды")]
@@ -0,0 +1,46 @@
+import httpx
+import pytest
+
+from parsers.urls import canonicalize_url
+from parsers.wiki_parser import WikiCrawler
+
+pytestmark = pytest.mark.anyio
+
+BASE = "https://ru.wikipedia.org"
+
+RENDER_PAGES = {
+    "Корень": '<div class="mw-parser-output"><p>Корень</p><a href="/wiki/Старое_название">a</a>'
+    '<a href="/wiki/Большая">b</a><a href="/wiki/Лист">c</a></div>',
+    # Страница перенаправления в action=render
+    "Старое_название": '<div class="mw-parser-output"><div class="redirectMsg"><p>Перенаправление на:</p>'
+    '<ul class="redirectText"><li><a href="/wiki/Новое_название">Новое название</a></li></ul></div></div>',
+    "Новое_название": '<div class="mw-parser-output"><p>Текст статьи</p><a href="/wiki/Лист">x</a></div>',
+    "Большая": '<div class="mw-parser-output"><p>' + "x" * 5000 + "</p></div>",
+    "Лист": '<div class="mw-parser-output"><p>Лист</p></div>',
+}
+
+
+def render_handler(request: httpx.Request) -> httpx.Response:
+    assert request.url.path == "/w/index.php"
+    assert request.url.params["action"] == "render"
+    return httpx.Response(200, text=RENDER_PAGES[request.url.params["title"]])
+
+
+@pytest.fixture
+async def client():
+    async with httpx.AsyncClient(transport=httpx.MockTransport(render_handler)) as client:
+        yield client
+
+
+async def test_render_variant_follows_redirects_and_skips_large_pages(client):
+    crawler = WikiCrawler(client=client, visited=set(), page_variant="render", max_children=5)
+    crawler.fetcher.max_bytes = 1000
+
+    article = await crawler.crawl(f"{BASE}/wiki/Корень", 2)
+
+    children = {child.title: child for child in article.children}
+    assert set(children) == {"Новое название", "Лист"}
+    target = children["Новое название"]
+    assert target.url == canonicalize_url(f"{BASE}/wiki/Новое_название")
+    assert target.content == "Текст статьи"
+    assert crawler.aliases == {canonicalize_url(f"{BASE}/wiki/Старое_название"): target.url}
@@ -0,0 +1,36 @@
+import asyncio
+import time
+
+import pytest
+
+from parsers.rate_limiter import HostRateLimiter, TokenBucket
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_token_bucket_allows_burst_then_rate():
+    bucket = TokenBucket(rate=50, capacity=5)
+
+    started_at = time.monotonic()
+    for _ in range(5):
+        await bucket.acquire()
+    burst = time.monotonic() - started_at
+    for _ in range(10):
+        await bucket.acquire()
+    elapsed = time.monotonic() - started_at
+
+    assert burst < 0.05
+    # 10 запросов сверх пика при 50 запросах в секунду
+    assert 0.18 <= elapsed < 0.4
+
+
+async def test_host_rate_limiter_is_per_host():
+    limiter = HostRateLimiter(rate=10, capacity=1)
+    await limiter.acquire("ru.wikipedia.org")
+
+    started_at = time.monotonic()
+    await asyncio.gather(limiter.acquire("en.wikipedia.org"), limiter.acquire("de.wikipedia.org"))
+    assert time.monotonic() - started_at < 0.05
+
+    await limiter.acquire("ru.wikipedia.org")
+    assert time.monotonic() - started_at >= 0.08
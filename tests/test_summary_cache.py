@@ -0,0 +1,49 @@
+import pytest
+
+from core.utils.cache import LRUCache
+from core.utils.circuit_breaker import CircuitBreaker
+from core.utils.summary_abstract import AbstractSummaryService
+from summaries.services import CachedSummaryService, ChunkedSummaryService, SummaryProvider, SummaryProviderChain
+
+pytestmark = pytest.mark.anyio
+
+
+class StubSummaryService(AbstractSummaryService):
+    def __init__(self, name: str, fail: bool = False) -> None:
+        self.name = name
+        self.fail = fail
+
+    def summary_params(self, text):
+        return {"service": self.name, "text": text}
+
+    async def generate_summary(self, text: str) -> str:
+        if self.fail:
+            raise RuntimeError(f"{self.name} is down")
+        return f"{self.name}: {text[:10]}"
+
+
+def make_chain(primary: StubSummaryService) -> SummaryProviderChain:
+    return SummaryProviderChain(
+        [
+            SummaryProvider(name, service, timeout=1, breaker=CircuitBreaker(name, 3, 60))
+            for name, service in (("free_gpt", primary), ("local", StubSummaryService("local")))
+        ]
+    )
+
+
+@pytest.mark.parametrize("chunked", [False, True])
+async def test_substitute_provider_answers_are_not_cached(chunked):
+    primary = StubSummaryService("free_gpt", fail=True)
+    memory = LRUCache(maxsize=10)
+    chain = make_chain(primary)
+    service = CachedSummaryService(ChunkedSummaryService(chain) if chunked else chain, memory, persistent=False)
+
+    assert (await service.generate_summary("Текст статьи")).startswith("local")
+    assert len(memory) == 0
+
+    primary.fail = False
+    assert (await service.generate_summary("Текст статьи")).startswith("free_gpt")
+    assert len(memory) == 1
+    # Ключ кэша описывает основной провайдер, а не всю цепочку
+    expected = ChunkedSummaryService(primary) if chunked else primary
+    assert service.summary_params("x") == expected.summary_params("x")